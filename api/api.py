@@ -1,11 +1,91 @@
 from flask import Flask, request, jsonify
+import os
 import torch
+from typing import Optional
 from utils import prepare_pred_df, get_dates
-from meteo_model.utils.model_utils import load_model
+from batching import MicroBatcher
+from model_cache import ModelCache
+from meteo_model.utils.model_utils import (
+    get_latest_model_version,
+    get_output_len,
+    load_model,
+    load_serving_model,
+    quantize_model,
+)
+from meteo_model.model.weather_model_lstm import WeatherModelLSTM
+from meteo_model.model.weather_model_tcn import BaseWeatherModelTCN
 from meteo_model.data.api.api_data_provider import get_weather_tensor_for_days
+from meteo_model.serving_config import (
+    MAX_DAYS,
+    SERVING_LOCATIONS,
+    check_multi_horizon_output_len,
+    get_input_len,
+    get_model_for_days,
+    get_serving_models,
+)
 
 app = Flask(__name__)
 
+STATEFUL_DECODING = os.getenv("STATEFUL_DECODING", "false").lower() in ("1", "true", "yes")
+# Only TCNs whose receptive field fits in the input length stream, the default channels don't.
+STREAMING_DECODING = os.getenv("STREAMING_DECODING", "false").lower() in ("1", "true", "yes")
+QUANTIZE_MODELS = os.getenv("QUANTIZE_MODELS", "false").lower() in ("1", "true", "yes")
+BATCH_WAIT_MS = float(os.getenv("BATCH_WAIT_MS", "10"))
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "8"))
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "60"))
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "false").lower() in ("1", "true", "yes")
+
+DEVICE = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+
+
+def prepare_model(model_name: str, model_version: int) -> torch.nn.Module:
+    if QUANTIZE_MODELS and DEVICE.type == "cpu":
+        model = quantize_model(load_model(model_name, model_version, map_location=DEVICE))
+    else:
+        model = load_serving_model(
+            model_name,
+            model_version,
+            map_location=DEVICE,
+            stateful_decoding=STATEFUL_DECODING,
+            streaming_decoding=STREAMING_DECODING,
+        )
+    model.eval()
+    input_len = get_input_len(model_name)
+    check_multi_horizon_output_len(
+        model_name, get_output_len(model, len(SERVING_LOCATIONS), input_len, DEVICE)
+    )
+    if isinstance(model, WeatherModelLSTM):
+        model.stateful_decoding = STATEFUL_DECODING
+    if isinstance(model, BaseWeatherModelTCN) and STREAMING_DECODING:
+        # Set once per load, as the cached model is shared by the request threads.
+        model.streaming_decoding = model.supports_streaming_decoding(input_len)
+        if not model.streaming_decoding:
+            app.logger.warning(
+                f"Streaming decoding disabled for {model_name} {model_version}: receptive field "
+                f"{model.receptive_field} exceeds the input length {input_len}."
+            )
+    return model
+
+
+model_cache = ModelCache(
+    prepare_model,
+    get_latest_model_version,
+    max_size=MODEL_CACHE_SIZE,
+    reload_interval=MODEL_RELOAD_INTERVAL,
+)
+
+
+def run_model(model_key: tuple[str, Optional[int]], X: torch.Tensor) -> torch.Tensor:
+    """
+    Predict a (B, N, L, F) batch of inputs with the registered model.
+    """
+    model = model_cache.get(*model_key)
+    with torch.inference_mode():
+        return model(X.to(DEVICE)).cpu()
+
+
+batcher = MicroBatcher(run_model, max_wait=BATCH_WAIT_MS / 1000)
+
 
 @app.route("/")
 def read_root():
@@ -17,41 +97,14 @@ def predict():
     data = request.get_json()
     n_days = data.get("n_days")
 
-    if n_days not in range(1, 9):
+    if n_days not in range(1, MAX_DAYS + 1):
         return jsonify({"detail": "Number of days must be between 1 and 8"}), 400
 
     try:
-        device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
-
-        model_for_days = {
-            1: ("MeteoModel-1_day", 2),
-            2: ("MeteoModel-2_days", 1),
-            3: ("MeteoModel-3_days", 1),
-            4: ("MeteoModel-4_days", 1),
-            5: ("MeteoModel-5_days", 1),
-            6: ("MeteoModel-6_days", 2),
-            7: ("MeteoModel-7_days", 2),
-            8: ("MeteoModel-8_days", 2),
-        }
-        input_len = {
-            1: 16,
-            2: 6,
-            3: 5,
-            4: 10,
-            5: 28,
-            6: 6,
-            7: 12,
-            8: 7,
-        }
-        X, pred_end_day = get_weather_tensor_for_days(
-            input_len[n_days], ["WARSAW", "WROCLAW", "POZNAN", "KRAKOW", "BIALYSTOK"]
-        )
-
-        model = load_model(*model_for_days[n_days], map_location=device)
-        model.eval()
+        model_name, model_version, input_len = get_model_for_days(n_days)
+        X, pred_end_day = get_weather_tensor_for_days(input_len, SERVING_LOCATIONS)
 
-        with torch.inference_mode():
-            pred = model(X.to(device))[0].detach().cpu().numpy()
+        pred = batcher.submit((model_name, model_version), X).numpy()
 
         preds = prepare_pred_df(pred).iloc[:n_days, :]
         preds["date"] = get_dates(pred_end_day, n_days)
@@ -63,4 +116,6 @@ def predict():
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000, debug=True)
+    if PRELOAD_MODELS:
+        model_cache.preload(get_serving_models())
+    app.run(host="0.0.0.0", port=8000, debug=True, threaded=True)
@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Generic, Hashable, TypeVar
+import torch
+
+Key = TypeVar("Key", bound=Hashable)
+
+
+class _Batch:
+    def __init__(self):
+        self.requests: list[tuple[torch.Tensor, Future]] = []
+        self.full = threading.Event()
+
+
+class MicroBatcher(Generic[Key]):
+    def __init__(
+        self,
+        predict_fn: Callable[[Key, torch.Tensor], torch.Tensor],
+        max_wait: float = 0.01,
+        max_batch_size: int = 64,
+    ):
+        """
+        Merges concurrent predictions of the same model into one forward pass.
+        While other requests are in flight, the first request of a key waits up to max_wait
+        seconds for other requests with the same key, then identical inputs are deduplicated
+        and the rest is stacked into one batch. A request with nothing else in flight runs at
+        once.
+
+        Args:
+            predict_fn (Callable): Runs the model of the key on a (B, ...) batch of inputs.
+            max_wait (float): Time in seconds to collect requests.
+            max_batch_size (int): Number of requests that starts the batch without waiting.
+        """
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._batches: dict[Key, _Batch] = {}
+        self._in_flight = 0
+
+    def submit(self, key: Key, x: torch.Tensor) -> torch.Tensor:
+        """
+        Predict a single input with the model of the key. Blocks until the batch is done.
+        """
+        future: Future = Future()
+        with self._lock:
+            self._in_flight += 1
+            batch = self._batches.get(key)
+            is_leader = batch is None
+            if batch is None:
+                batch = self._batches[key] = _Batch()
+            batch.requests.append((x, future))
+            if len(batch.requests) >= self.max_batch_size:
+                del self._batches[key]
+                batch.full.set()
+            others_in_flight = self._in_flight > 1
+
+        try:
+            if is_leader:
+                if others_in_flight:
+                    batch.full.wait(self.max_wait)
+                with self._lock:
+                    if self._batches.get(key) is batch:
+                        del self._batches[key]
+                self._run_batch(key, batch.requests)
+            return future.result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _run_batch(self, key: Key, requests: list[tuple[torch.Tensor, Future]]) -> None:
+        unique_inputs: dict[tuple[torch.Size, torch.dtype, bytes], int] = {}
+        inputs: list[torch.Tensor] = []
+        indices = []
+        for x, _ in requests:
+            x = x.detach().cpu().contiguous()
+            input_key = (x.shape, x.dtype, x.numpy().tobytes())
+            index = unique_inputs.setdefault(input_key, len(inputs))
+            if index == len(inputs):
+                inputs.append(x)
+            indices.append(index)
+
+        try:
+            outputs = self.predict_fn(key, torch.stack(inputs))
+        except Exception as e:
+            for _, future in requests:
+                future.set_exception(e)
+            return
+
+        for (_, future), index in zip(requests, indices):
+            future.set_result(outputs[index])
@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+import torch
+
+ModelKey = tuple[str, int]
+
+
+class ModelCache:
+    def __init__(
+        self,
+        load_fn: Callable[[str, int], torch.nn.Module],
+        latest_version_fn: Callable[[str], int],
+        max_size: int = 8,
+        reload_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        LRU cache of loaded models, so requests do not deserialize the model weights.
+        Models requested without a version follow the latest registered version, which is
+        checked at most every reload_interval seconds. A new version is loaded on its first use
+        and replaces the previous one. If the check fails, the last known version keeps being
+        served and the check is retried after reload_interval seconds.
+
+        Args:
+            load_fn (Callable): Loads the model of the given name and version.
+            latest_version_fn (Callable): Returns the latest registered version of a model.
+            max_size (int): Maximum number of models kept in memory.
+            reload_interval (float): Time in seconds after which the latest version is checked.
+            clock (Callable): Time source in seconds.
+        """
+        self.load_fn = load_fn
+        self.latest_version_fn = latest_version_fn
+        self.max_size = max_size
+        self.reload_interval = reload_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._models: OrderedDict[ModelKey, torch.nn.Module] = OrderedDict()
+        self._load_locks: dict[ModelKey, threading.Lock] = {}
+        self._latest_versions: dict[str, tuple[int, float]] = {}
+
+    def resolve_version(self, name: str, version: Optional[int] = None) -> int:
+        if version is not None:
+            return version
+        with self._lock:
+            latest = self._latest_versions.get(name)
+        if latest is not None and self.clock() - latest[1] < self.reload_interval:
+            return latest[0]
+        try:
+            latest_version = self.latest_version_fn(name)
+        except Exception as e:
+            if latest is None:
+                raise
+            logging.warning(
+                f"Checking the latest version of {name} failed, serving version {latest[0]}: {e}"
+            )
+            latest_version = latest[0]
+        with self._lock:
+            self._latest_versions[name] = (latest_version, self.clock())
+        return latest_version
+
+    def _get_cached(self, key: ModelKey) -> Optional[torch.nn.Module]:
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+            return model
+
+    def get(self, name: str, version: Optional[int] = None) -> torch.nn.Module:
+        """
+        Get the model, loading it if it is not cached. Concurrent requests of a model that is
+        not cached yet wait for a single load.
+        """
+        key = (name, self.resolve_version(name, version))
+        model = self._get_cached(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            model = self._get_cached(key)
+            if model is not None:
+                return model
+            model = self.load_fn(*key)
+            with self._lock:
+                if version is None:
+                    for cached_key in [k for k in self._models if k[0] == name]:
+                        del self._models[cached_key]
+                self._models[key] = model
+                while len(self._models) > self.max_size:
+                    self._models.popitem(last=False)
+                self._load_locks.pop(key, None)
+        return model
+
+    def preload(self, models: list[tuple[str, Optional[int]]]) -> None:
+        for name, version in models:
+            self.get(name, version)
@@ -0,0 +1,45 @@
+from meteo_model.utils.evaluation_utils import compare_models
+from meteo_model.utils.model_utils import load_model, quantize_model
+from meteo_model.data.data_loader import create_dataloaders
+from meteo_model.data.config import LOCATIONS_NAMES
+from pathlib import Path
+import argparse
+import os
+import torch
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare a registered model with its dynamic int8 quantization on CPU."
+    )
+    parser.add_argument("--model_name", type=str, default="MeteoModel-1_day")
+    parser.add_argument("--model_version", type=int, default=2)
+    parser.add_argument("--n_locations", type=int, default=5)
+    parser.add_argument("--input_len", type=int, default=16)
+    parser.add_argument("--output_len", type=int, default=1)
+    parser.add_argument("--batch_size", type=int, default=16)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    device = torch.device("cpu")
+    num_workers = os.cpu_count() or 1
+
+    _, test_dl = create_dataloaders(
+        root_dir=Path("data/normalized"),
+        location=LOCATIONS_NAMES[: args.n_locations],
+        input_len=args.input_len,
+        output_len=args.output_len,
+        split_ratio=0.8,
+        batch_size=args.batch_size,
+        num_workers=num_workers,
+    )
+
+    model = load_model(args.model_name, args.model_version, map_location=device)
+    results = compare_models({"Float": model, "Int8": quantize_model(model)}, test_dl, device)
+    print(results.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from meteo_model.utils.evaluation_utils import compare_models
+from meteo_model.utils.model_utils import load_model
+from meteo_model.data.data_loader import create_dataloaders
+from meteo_model.data.config import LOCATIONS_NAMES
+from pathlib import Path
+import argparse
+import copy
+import os
+import torch
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare sliding window and stateful decoding of a registered LSTM model."
+    )
+    parser.add_argument("--model_name", type=str, default="MeteoModel-5_days")
+    parser.add_argument("--model_version", type=int, default=1)
+    parser.add_argument("--n_locations", type=int, default=5)
+    parser.add_argument("--input_len", type=int, default=28)
+    parser.add_argument("--output_len", type=int, default=5)
+    parser.add_argument("--batch_size", type=int, default=16)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+    num_workers = os.cpu_count() or 1
+
+    _, test_dl = create_dataloaders(
+        root_dir=Path("data/normalized"),
+        location=LOCATIONS_NAMES[: args.n_locations],
+        input_len=args.input_len,
+        output_len=args.output_len,
+        split_ratio=0.8,
+        batch_size=args.batch_size,
+        num_workers=num_workers,
+    )
+
+    model = load_model(args.model_name, args.model_version, map_location=device)
+    stateful_model = copy.deepcopy(model)
+    model.stateful_decoding = False
+    stateful_model.stateful_decoding = True
+
+    results = compare_models(
+        {"Sliding window": model, "Stateful": stateful_model}, test_dl, device
+    )
+    print(results.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from meteo_model.model.weather_model_tcn import GroupedWeatherModelTCN, WeatherModelTCN
+from meteo_model.utils.model_utils import load_model
+import argparse
+import mlflow
+import mlflow.pytorch
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Convert a registered WeatherModelTCN into a GroupedWeatherModelTCN."
+    )
+    parser.add_argument("--model_name", type=str, required=True)
+    parser.add_argument("--model_version", type=int, required=True)
+    parser.add_argument(
+        "--output_name",
+        type=str,
+        default=None,
+        help="Registered name of the converted model, <model_name>-grouped by default",
+    )
+    parser.add_argument("--experiment_name", type=str, default="ModelConversion")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    model = load_model(args.model_name, args.model_version, map_location="cpu")
+    if not isinstance(model, WeatherModelTCN):
+        raise ValueError(f"{args.model_name} version {args.model_version} is not a TCN model.")
+
+    grouped = GroupedWeatherModelTCN.from_per_location(model)
+    output_name = args.output_name or f"{args.model_name}-grouped"
+
+    mlflow.set_experiment(args.experiment_name)
+    with mlflow.start_run():
+        mlflow.log_param("Source Model", f"{args.model_name}/{args.model_version}")
+        mlflow.log_param("Model Type", "TCN")
+        mlflow.pytorch.log_model(grouped, "models", registered_model_name=output_name)
+    print(f"Registered {output_name}.")
+
+
+if __name__ == "__main__":
+    main()
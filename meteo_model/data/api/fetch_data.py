@@ -1,14 +1,24 @@
+import calendar
 import os
 from datetime import datetime, timedelta
 import requests
 import pandas as pd
-from time import sleep
+import threading
+from time import monotonic, sleep
+from typing import Optional
 from meteo_model.data.data_cleaner import DataCleanerFromDict
 from meteo_model.data.config import PATH_TO_STATS
 from meteo_model.data.normaliser import normalize_data
 import json
 from meteo_model.utils.api_utils import load_env
 from meteo_model.data.config import LOCATIONS, API_URL
+from meteo_model.data.api.weather_cache import StationData, WeatherDataCache
+
+# Minimal time in seconds between two requests to the API
+MIN_REQUEST_INTERVAL = 0.5
+
+_request_lock = threading.Lock()
+_last_request_time: Optional[float] = None
 
 
 def get_request_headers() -> dict[str, str]:
@@ -19,6 +29,19 @@ def get_request_headers() -> dict[str, str]:
     return {"x-rapidapi-key": API_KEY, "x-rapidapi-host": "meteostat.p.rapidapi.com"}
 
 
+def wait_for_request_slot() -> None:
+    """
+    Wait until MIN_REQUEST_INTERVAL has passed since the previous request to the API.
+    """
+    global _last_request_time
+    with _request_lock:
+        if _last_request_time is not None:
+            delay = _last_request_time + MIN_REQUEST_INTERVAL - monotonic()
+            if delay > 0:
+                sleep(delay)
+        _last_request_time = monotonic()
+
+
 def fetch_weather_data(location: str, start_date: str, end_date: str) -> list:
     if location not in LOCATIONS:
         print(f"Location does not exist in LOCATIONS config.")
@@ -31,6 +54,7 @@ def fetch_weather_data(location: str, start_date: str, end_date: str) -> list:
         "end": end_date,
     }
 
+    wait_for_request_slot()
     response = requests.get(API_URL, headers=get_request_headers(), params=querystring)
 
     if response.status_code == 200:
@@ -52,7 +76,6 @@ def get_weather_data_for_days(days: int, location_names: list[str]) -> dict[str,
     data = {}
     for location in location_names:
         data[location] = fetch_weather_data(location, start_date, end_date)
-        sleep(0.5)
     return data
 
 
@@ -67,10 +90,16 @@ def get_start_day_number(date_str: str) -> int:
     return day_number
 
 
+def get_days_in_year(date_str: str) -> int:
+    date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+    return 366 if calendar.isleap(date.year) else 365
+
+
 def clean_api_data(api_data: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
     for city, df in api_data.items():
         day_number = get_start_day_number(df["date"].iloc[0])
-        cleaner = DataCleanerFromDict(df, city, day_number)
+        days_in_year = get_days_in_year(df["date"].iloc[0])
+        cleaner = DataCleanerFromDict(df, city, day_number, days_in_year)
         cleaner.get_cleaned_df()
     return api_data
 
@@ -97,9 +126,36 @@ def get_date(df_dict: dict[str, pd.DataFrame]) -> str:
     return df_dict[key]["date"].iloc[-1]
 
 
+def get_station_data(location: str, start_date: str, end_date: str) -> StationData:
+    """
+    Fetch, clean and normalise the data of a single station.
+    Returns the cleaned and the normalised dataframe.
+    """
+    weather_data = fetch_weather_data(location, start_date, end_date)
+    cleaned = clean_api_data({location: transform_dict_into_df(weather_data)})
+    normalised = normalise_cleaned_api_data(cleaned)
+    return cleaned[location], normalised[location]
+
+
 def get_normalised_data_from_api(
-    days: int, location_names: list[str]
+    days: int, location_names: list[str], cache: Optional[WeatherDataCache] = None
 ) -> tuple[dict[str, pd.DataFrame], str]:
+    """
+    Get the normalised data of the last days for the given stations and the date of the last
+    day. With a cache, the data of stations already fetched for the same dates is reused.
+    """
+    if cache is not None:
+        start_date, end_date = get_datetimes(days)
+        cleaned, normalised = {}, {}
+        for location in location_names:
+            cleaned[location], normalised[location] = cache.get_or_fetch(
+                location,
+                start_date,
+                end_date,
+                lambda: get_station_data(location, start_date, end_date),
+            )
+        return normalised, get_date(cleaned)
+
     weather_data_dict = get_weather_data_for_days(days, location_names)
     weather_data_df_dict = {
         city: transform_dict_into_df(weather_data_of_city)
@@ -0,0 +1,186 @@
+"""Cache of the cleaned and normalised weather data fetched from the Meteostat API"""
+
+import os
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+from meteo_model.utils.file_utils import prepare_directory
+
+# (station, start_date, end_date)
+CacheKey = tuple[str, str, str]
+# (cleaned data, normalised data)
+StationData = tuple[pd.DataFrame, pd.DataFrame]
+# (time the data was stored, data)
+CacheEntry = tuple[float, StationData]
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        pass
+
+    @abstractmethod
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: CacheKey) -> None:
+        pass
+
+    @abstractmethod
+    def keys(self) -> list[CacheKey]:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self):
+        self._entries: dict[CacheKey, CacheEntry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+
+    def delete(self, key: CacheKey) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def keys(self) -> list[CacheKey]:
+        with self._lock:
+            return list(self._entries)
+
+
+class DiskCacheBackend(CacheBackend):
+    def __init__(self, cache_dir: Path):
+        """
+        Stores every entry in a <station>_<start_date>_<end_date>.pkl file of cache_dir,
+        so the cache is shared between processes and survives restarts.
+        """
+        self.cache_dir = cache_dir
+        prepare_directory(cache_dir)
+
+    def _get_path(self, key: CacheKey) -> Path:
+        return self.cache_dir / f"{'_'.join(key)}.pkl"
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        try:
+            with open(self._get_path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def set(self, key: CacheKey, entry: CacheEntry) -> None:
+        path = self._get_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f)
+        tmp_path.replace(path)
+
+    def delete(self, key: CacheKey) -> None:
+        self._get_path(key).unlink(missing_ok=True)
+
+    def keys(self) -> list[CacheKey]:
+        keys = []
+        for path in self.cache_dir.glob("*.pkl"):
+            station, start_date, end_date = path.stem.rsplit("_", 2)
+            keys.append((station, start_date, end_date))
+        return keys
+
+
+class WeatherDataCache:
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Reuses the data of a station fetched for the same date range.
+        Entries expire after ttl seconds, as the data of the current day can still change,
+        and entries of the previous days are evicted when the date changes.
+
+        Args:
+            backend (CacheBackend): Storage of the entries, in memory by default.
+            ttl (float): Time in seconds after which an entry is fetched again.
+            clock (Callable): Time source in seconds since the epoch.
+        """
+        self.backend = backend or MemoryCacheBackend()
+        self.ttl = ttl
+        self.clock = clock
+        self._today: Optional[str] = None
+        self._lock = threading.Lock()
+        self._fetch_locks: dict[CacheKey, threading.Lock] = {}
+
+    def _is_valid(self, key: CacheKey, entry: CacheEntry, today: str) -> bool:
+        return key[2] >= today and self.clock() - entry[0] < self.ttl
+
+    def _get_valid(self, key: CacheKey, today: str) -> Optional[StationData]:
+        entry = self.backend.get(key)
+        if entry is not None and self._is_valid(key, entry, today):
+            return entry[1]
+        return None
+
+    def evict(self) -> None:
+        """
+        Delete the expired entries and the entries of date ranges ending before today.
+        """
+        today = datetime.fromtimestamp(self.clock()).strftime("%Y-%m-%d")
+        for key in self.backend.keys():
+            entry = self.backend.get(key)
+            if entry is None or not self._is_valid(key, entry, today):
+                self.backend.delete(key)
+        with self._lock:
+            for key in [key for key in self._fetch_locks if key[2] < today]:
+                del self._fetch_locks[key]
+        self._today = today
+
+    def get_or_fetch(
+        self,
+        station: str,
+        start_date: str,
+        end_date: str,
+        fetch_fn: Callable[[], StationData],
+    ) -> StationData:
+        """
+        Get the cached data of the station, calling fetch_fn if it is missing or expired.
+        Date ranges ending before today are not cached, as they would be evicted right away.
+        Concurrent requests of data that is not cached wait for a single fetch.
+        """
+        today = datetime.fromtimestamp(self.clock()).strftime("%Y-%m-%d")
+        if today != self._today:
+            self.evict()
+
+        key = (station, start_date, end_date)
+        data = self._get_valid(key, today)
+        if data is None:
+            with self._lock:
+                fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+            with fetch_lock:
+                data = self._get_valid(key, today)
+                if data is None:
+                    data = fetch_fn()
+                    if end_date >= today:
+                        self.backend.set(key, (self.clock(), data))
+        cleaned, normalised = data
+        return cleaned.copy(), normalised.copy()
+
+
+def create_weather_cache() -> WeatherDataCache:
+    """
+    Weather data cache configured by the WEATHER_CACHE_DIR (on-disk store instead of the
+    in-process one) and WEATHER_CACHE_TTL (seconds) environment variables.
+    """
+    cache_dir = os.getenv("WEATHER_CACHE_DIR")
+    backend = DiskCacheBackend(Path(cache_dir)) if cache_dir else MemoryCacheBackend()
+    return WeatherDataCache(backend, ttl=float(os.getenv("WEATHER_CACHE_TTL", "3600")))
@@ -17,6 +17,9 @@ LOCATIONS_NAMES = list(LOCATIONS.keys())
 PATHS_TO_DATA_FILES_STR = "data/processed/weather_data/*/*.csv"
 PATH_TO_STATS = "data/stats.json"
 MEDIAN_DIR = "data/median"
+CACHE_FILE_NAME = "weather_data_cache.npz"
+MANIFEST_DIR = "data/manifest"
+MMAP_DIR = "data/mmap"
 
 API_URL = "https://meteostat.p.rapidapi.com/point/daily"
 
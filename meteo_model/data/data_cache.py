@@ -0,0 +1,203 @@
+"""Binary cache of the weather data CSV files of a pipeline stage"""
+
+import json
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from meteo_model.data.config import BASE_PATH, CACHE_FILE_NAME
+from meteo_model.utils.file_utils import get_file_signature
+
+STAGE_DIRS = [Path(BASE_PATH), Path("data/processed/weather_data"), Path("data/normalized")]
+
+_MANIFEST_KEY = "manifest"
+_TEXT_BLOCK = "text"
+
+_loaded_caches: Dict[Path, "StageCache"] = {}
+
+
+class StageCache:
+    def __init__(self, root_dir: Path, manifest: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        """
+        In-memory view of the cache file of one pipeline stage.
+
+        Args:
+            root_dir (Path): Directory containing the <year>/<station>_weather_data.csv files.
+            manifest (dict): Source file signature and columns of every cached file.
+            arrays (dict): Column arrays of every cached file.
+        """
+        self.root_dir = root_dir.resolve()
+        self.manifest = manifest
+        self.arrays = arrays
+        self.signature = get_file_signature(get_cache_path(root_dir))
+
+    def get(self, file_path: Path) -> Optional[pd.DataFrame]:
+        """
+        Get the dataframe of the given CSV file.
+        Returns None if the file is not cached or has changed since the cache was written.
+        """
+        key = _get_key(self.root_dir, file_path)
+        entry = self.manifest.get(key)
+        if entry is None or entry["signature"] != get_file_signature(file_path):
+            return None
+
+        columns = {}
+        for column, (block_name, i) in zip(entry["columns"], entry["blocks"]):
+            values = self.arrays[f"{entry['id']}_{block_name}"][i]
+            if block_name == _TEXT_BLOCK:
+                values = np.where(values == "", np.nan, values.astype(object))
+            columns[column] = values
+        return pd.DataFrame(columns)
+
+
+def get_cache_path(root_dir: Path) -> Path:
+    return root_dir / CACHE_FILE_NAME
+
+
+def _get_key(root_dir: Path, file_path: Path) -> str:
+    return Path(file_path).resolve().relative_to(root_dir.resolve()).as_posix()
+
+
+def _pack_csv(csv_path: Path) -> tuple[list[str], list[tuple[str, int]], Dict[str, np.ndarray]]:
+    """
+    Read a CSV file and stack its columns into one block per dtype.
+    Returns the columns, the (block name, row) of every column and the blocks.
+    """
+    df = pd.read_csv(csv_path)
+    blocks: Dict[str, list[np.ndarray]] = defaultdict(list)
+    block_indices = []
+    for column in df.columns:
+        values = df[column].to_numpy()
+        block_name = values.dtype.name
+        if values.dtype == object:
+            block_name = _TEXT_BLOCK
+            values = df[column].fillna("").astype(str).to_numpy(dtype=str)
+        block_indices.append((block_name, len(blocks[block_name])))
+        blocks[block_name].append(values)
+    return (
+        list(df.columns),
+        block_indices,
+        {block_name: np.stack(block) for block_name, block in blocks.items()},
+    )
+
+
+def write_stage_cache(root_dir: Path, previous: Optional[StageCache] = None) -> Optional[Path]:
+    """
+    Pack all <year>/<station>_weather_data.csv files of a stage into a single NPZ file.
+    Columns of each file are stacked into one block per dtype. Text columns are stored as
+    strings, missing values as empty strings. Files that are up to date in the previous cache
+    are copied from it instead of being parsed again.
+    """
+    csv_paths = sorted(root_dir.glob("*/*_weather_data.csv"))
+    if not csv_paths:
+        return None
+
+    manifest: Dict[str, Any] = {}
+    arrays: Dict[str, np.ndarray] = {}
+    for file_id, csv_path in enumerate(csv_paths):
+        key = _get_key(root_dir, csv_path)
+        signature = get_file_signature(csv_path)
+        entry = None if previous is None else previous.manifest.get(key)
+        if previous is not None and entry is not None and entry["signature"] == signature:
+            columns, block_indices = entry["columns"], entry["blocks"]
+            blocks = {
+                block_name: previous.arrays[f"{entry['id']}_{block_name}"]
+                for block_name, _ in block_indices
+            }
+        else:
+            columns, block_indices, blocks = _pack_csv(csv_path)
+
+        for block_name, block in blocks.items():
+            arrays[f"{file_id}_{block_name}"] = block
+        manifest[key] = {
+            "id": file_id,
+            "signature": signature,
+            "columns": columns,
+            "blocks": block_indices,
+        }
+
+    cache_path = get_cache_path(root_dir)
+    tmp_path = cache_path.with_suffix(".tmp.npz")
+    np.savez(tmp_path, **arrays, **{_MANIFEST_KEY: np.array(json.dumps(manifest))})
+    tmp_path.replace(cache_path)
+    _loaded_caches.pop(root_dir.resolve(), None)
+    return cache_path
+
+
+def is_stage_cache_up_to_date(root_dir: Path) -> bool:
+    """
+    Check if the cache file of a stage holds exactly the current CSV files of the stage.
+    Only the manifest is read from the cache file, the CSV files are compared by signature.
+    """
+    cache_path = get_cache_path(root_dir)
+    if not cache_path.exists():
+        return False
+    with np.load(cache_path) as npz:
+        manifest = json.loads(str(npz[_MANIFEST_KEY]))
+
+    csv_paths = sorted(root_dir.glob("*/*_weather_data.csv"))
+    if set(manifest) != {_get_key(root_dir, csv_path) for csv_path in csv_paths}:
+        return False
+    return all(
+        manifest[_get_key(root_dir, csv_path)]["signature"] == get_file_signature(csv_path)
+        for csv_path in csv_paths
+    )
+
+
+def update_stage_cache(root_dir: Path) -> Optional[Path]:
+    """
+    Write the cache file of a stage unless it is already up to date. Only the new and changed
+    CSV files are parsed, the others are copied from the current cache file.
+    Returns the path of the written cache file, None if nothing was written.
+    """
+    if is_stage_cache_up_to_date(root_dir):
+        return None
+    return write_stage_cache(root_dir, load_stage_cache(root_dir))
+
+
+def load_stage_cache(root_dir: Path) -> Optional[StageCache]:
+    """
+    Load the cache file of a stage, reusing the already loaded one if it has not changed.
+    """
+    cache_path = get_cache_path(root_dir)
+    if not cache_path.exists():
+        return None
+
+    cache_key = root_dir.resolve()
+    cache = _loaded_caches.get(cache_key)
+    if cache is not None and cache.signature == get_file_signature(cache_path):
+        return cache
+
+    with np.load(cache_path) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+    manifest = json.loads(str(arrays.pop(_MANIFEST_KEY)))
+    cache = StageCache(root_dir, manifest, arrays)
+    _loaded_caches[cache_key] = cache
+    return cache
+
+
+def read_weather_csv(file_path: Path) -> pd.DataFrame:
+    """
+    Read a <root>/<year>/<station>_weather_data.csv file, preferring the stage cache when it
+    holds an up to date copy of the file.
+    """
+    file_path = Path(file_path)
+    cache = load_stage_cache(file_path.parent.parent)
+    if cache is not None:
+        df = cache.get(file_path)
+        if df is not None:
+            return df
+    return pd.read_csv(file_path)
+
+
+def main():
+    for stage_dir in STAGE_DIRS:
+        cache_path = write_stage_cache(stage_dir)
+        if cache_path is not None:
+            print(f"{stage_dir}: cache written to {cache_path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,13 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import os
+import warnings
 
 from meteo_model.utils.file_utils import prepare_directory
 from meteo_model.data.config import MEDIAN_DIR
 
+SEASONAL_COLUMNS = ["prcp", "wdir", "wspd", "pres"]
+
 
 class DataCleaner:
     def __init__(self, dataframes, columns_to_drop=["station", "tsun", "wpgt"]):
@@ -37,28 +40,19 @@ class DataCleaner:
     def calculate_median_by_day(self) -> pd.DataFrame:
         """
         Calculate the median values for each day of the year.
+        The dataframes are stacked into a (dataframes, 366, columns) array padded with NaN
+        and reduced with nanmedian along the first axis.
         """
-        median_by_day = pd.DataFrame(index=range(366), columns=["prcp", "wdir", "wspd", "pres"])
-
-        for day in range(366):
-            day_data = [df.iloc[day] for df in self.dataframes if len(df) > day]
-            day_df = pd.DataFrame(day_data).dropna(how="all")
-
-            if not day_df.empty:
-                median_by_day.loc[day, "prcp"] = (
-                    day_df["prcp"].median() if "prcp" in day_df else np.nan
-                )
-                median_by_day.loc[day, "wdir"] = (
-                    day_df["wdir"].median() if "wdir" in day_df else np.nan
-                )
-                median_by_day.loc[day, "wspd"] = (
-                    day_df["wspd"].median() if "wspd" in day_df else np.nan
-                )
-                median_by_day.loc[day, "pres"] = (
-                    day_df["pres"].median() if "pres" in day_df else np.nan
-                )
-
-        return median_by_day
+        stacked = np.full((len(self.dataframes), 366, len(SEASONAL_COLUMNS)), np.nan)
+        for i, df in enumerate(self.dataframes):
+            values = df.reindex(columns=SEASONAL_COLUMNS).to_numpy(dtype=float)[:366]
+            stacked[i, : len(values)] = values
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            median_by_day = np.nanmedian(stacked, axis=0)
+
+        return pd.DataFrame(median_by_day, columns=SEASONAL_COLUMNS)
 
     def save_median_to_file(self, median_by_day: pd.DataFrame, file_path: Path) -> None:
         median_by_day.to_csv(file_path, index=False)
@@ -67,10 +61,13 @@ class DataCleaner:
         return pd.read_csv(file_path)
 
     def handle_NaN_based_on_sesonal_pattern(
-        self, median_file: Path, start_offset: int = 0
+        self, median_file: Path, start_offset: int = 0, days_in_year: int = 366
     ) -> None:
         """
         Handle missing values in the data based on group. In Place.
+        Missing values of the first 366 rows are filled with the median of the same day of the
+        year, the first row being day start_offset of a year of days_in_year days. Days past the
+        end of that year wrap around to the start of the next one.
         """
         if os.path.exists(median_file):
             median_by_day = self.load_median_from_file(median_file)
@@ -78,10 +75,11 @@ class DataCleaner:
             median_by_day = self.calculate_median_by_day()
             self.save_median_to_file(median_by_day, median_file)
         for df in self.dataframes:
-            for day in range((min(366, len(df)))):
-                for column in ["prcp", "wdir", "wspd", "pres"]:
-                    if pd.isna(df.at[day, column]):
-                        df.at[day, column] = median_by_day.at[day + start_offset, column]
+            n_days = min(366, len(df))
+            days = (np.arange(n_days) + start_offset) % days_in_year
+            for column in SEASONAL_COLUMNS:
+                seasonal = median_by_day[column].to_numpy(dtype=float)[days]
+                df[column] = df[column].fillna(pd.Series(seasonal, index=df.index[:n_days]))
 
     def clip_snow(self) -> None:
         """
@@ -101,20 +99,27 @@ class DataCleanerAndSaver(DataCleaner):
         Save the cleaned dataframes to csv files.
         """
         for df, raw_path in zip(self.dataframes, self.data_paths):
-            processed_file_path = str(raw_path).replace("raw", "processed")
-            prepare_directory(Path(processed_file_path).parent)
+            processed_file_path = self.get_processed_path(raw_path)
+            prepare_directory(processed_file_path.parent)
             df.to_csv(processed_file_path, index=False)
 
+    @staticmethod
+    def get_processed_path(raw_path: Path) -> Path:
+        return Path(str(raw_path).replace("raw", "processed"))
+
 
 class DataCleanerFromDict(DataCleaner):
-    def __init__(self, df: pd.DataFrame, city_name: str, date_offset: int):
+    def __init__(
+        self, df: pd.DataFrame, city_name: str, date_offset: int, days_in_year: int = 366
+    ):
         super().__init__([df], ["tsun", "wpgt"])
         self.city_name = city_name
         self.date_offset = date_offset
+        self.days_in_year = days_in_year
 
     def get_cleaned_df(self) -> None:
         self.drop_columns()
         self.handle_NaN_based_on_trend()
         median_file = Path(MEDIAN_DIR) / f"{self.city_name}.csv"
-        self.handle_NaN_based_on_sesonal_pattern(median_file, self.date_offset)
+        self.handle_NaN_based_on_sesonal_pattern(median_file, self.date_offset, self.days_in_year)
         self.clip_snow()
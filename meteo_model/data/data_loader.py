@@ -1,8 +1,76 @@
 from torch.utils.data import DataLoader, Subset
 from pathlib import Path
-from meteo_model.data.datasets import MeteoDataset
+from meteo_model.data.datasets import MeteoDataset, gather_windows
 import os
-from typing import Optional
+import math
+import torch
+from typing import Any, Iterator, Optional, Union
+
+
+class BatchedSubset(Subset):
+    """
+    Subset of MeteoDataset that DataLoader reads batch by batch through MeteoDataset.get_batch.
+    Must be used with collate_batch.
+    """
+
+    dataset: MeteoDataset
+
+    def __getitems__(self, indices: list[int]) -> tuple[torch.Tensor, torch.Tensor]:  # type: ignore
+        return self.dataset.get_batch([self.indices[idx] for idx in indices])
+
+
+def collate_batch(batch: Any) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Collate function for batches already gathered by BatchedSubset.
+    """
+    return batch
+
+
+class DeviceDataLoader:
+    def __init__(
+        self,
+        dataset: BatchedSubset,
+        series: torch.Tensor,
+        batch_size: int = 16,
+        shuffle: bool = False,
+    ):
+        """
+        Loader that gathers window batches directly from a series tensor kept on the target
+        device, without worker processes or host-to-device copies per batch.
+
+        Args:
+            dataset (BatchedSubset): Subset of a preloaded MeteoDataset.
+            series (torch.Tensor): The dataset array, already placed on the target device.
+            batch_size (int): Number of samples per batch.
+            shuffle (bool): Shuffle the samples every epoch.
+        """
+        self.dataset = dataset
+        self.series = series
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+
+        meteo_dataset = dataset.dataset
+        self.input_len = meteo_dataset.input_len
+        self.output_len = meteo_dataset.output_len
+        self.target_idx = meteo_dataset.location.index(meteo_dataset.target_location)
+        self.indices = torch.as_tensor(list(dataset.indices), device=series.device)
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __iter__(self) -> Iterator[tuple[torch.Tensor, torch.Tensor]]:
+        indices = self.indices
+        if self.shuffle:
+            indices = indices[torch.randperm(len(indices), device=indices.device)]
+
+        for start in range(0, len(indices), self.batch_size):
+            yield gather_windows(
+                self.series,
+                indices[start : start + self.batch_size],
+                self.input_len,
+                self.output_len,
+                self.target_idx,
+            )
 
 
 def create_dataloaders(
@@ -13,20 +81,48 @@ def create_dataloaders(
     split_ratio: float = 0.8,
     batch_size: int = 16,
     num_workers: int = 1,
-) -> tuple[DataLoader, DataLoader]:
+    mmap_dir: Optional[Path] = None,
+    shuffle: bool = False,
+    device: Optional[Union[str, torch.device]] = None,
+) -> Union[tuple[DataLoader, DataLoader], tuple[DeviceDataLoader, DeviceDataLoader]]:
+    """
+    Create the train and test loaders. If device is given, the whole dataset is placed on that
+    device once and batches are gathered there by DeviceDataLoader instead of a DataLoader.
+    """
     dataset = MeteoDataset(
-        root_dir=root_dir, location=location, input_len=input_len, output_len=output_len
+        root_dir=root_dir,
+        location=location,
+        input_len=input_len,
+        output_len=output_len,
+        mmap_dir=mmap_dir,
     )
     split_idx = int(split_ratio * len(dataset))
 
-    train_dataset = Subset(dataset, range(split_idx))
-    test_dataset = Subset(dataset, range(split_idx, len(dataset)))
+    train_dataset = BatchedSubset(dataset, range(split_idx))
+    test_dataset = BatchedSubset(dataset, range(split_idx, len(dataset)))
+
+    if device is not None:
+        if dataset.array is None:
+            raise ValueError("Device loaders require a preloaded dataset.")
+        series = torch.from_numpy(dataset.array).to(device)
+        return (
+            DeviceDataLoader(train_dataset, series, batch_size=batch_size, shuffle=shuffle),
+            DeviceDataLoader(test_dataset, series, batch_size=batch_size),
+        )
 
     train_dataloader = DataLoader(
-        train_dataset, batch_size=batch_size, shuffle=False, num_workers=num_workers
+        train_dataset,
+        batch_size=batch_size,
+        shuffle=shuffle,
+        num_workers=num_workers,
+        collate_fn=collate_batch,
     )
     test_dataloader = DataLoader(
-        test_dataset, batch_size=batch_size, shuffle=False, num_workers=num_workers
+        test_dataset,
+        batch_size=batch_size,
+        shuffle=False,
+        num_workers=num_workers,
+        collate_fn=collate_batch,
     )
 
     return train_dataloader, test_dataloader
@@ -1,11 +1,18 @@
+import bisect
+import hashlib
+import json
+import os
 import torch
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, default_collate
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 from meteo_model.data.config import LOCATIONS_NAMES, DATASET_START_YEAR, DATASET_END_YEAR
+from meteo_model.data.data_cache import read_weather_csv
+from meteo_model.utils.file_utils import get_file_signature
 
 
 class MeteoDataset(Dataset):
@@ -16,6 +23,8 @@ class MeteoDataset(Dataset):
         target_location: str = LOCATIONS_NAMES[0],
         input_len: int = 32,
         output_len: int = 8,
+        preload: bool = True,
+        mmap_dir: Optional[Path] = None,
     ):
         """
         Dataset for weather data.
@@ -26,9 +35,16 @@ class MeteoDataset(Dataset):
             target_location (str): Target Location.
             input_len (int): Number of days to look back.
             output_len (int): Number of days to predict.
+            preload (bool): Pack all years and locations into one contiguous float32 array
+                shaped (num_locations, total_days, num_features), so samples are views of it.
+            mmap_dir (Path): Directory to save the preloaded array to. If given, the array is
+                memory-mapped from that file, so DataLoader workers share one physical copy
+                instead of receiving a pickled copy of the data.
         """
         if output_len < 1:
             raise ValueError("output_len should be greater than 0.")
+        if mmap_dir is not None and not preload:
+            raise ValueError("mmap_dir requires preload.")
         if not root_dir.exists():
             raise ValueError("root_dir does not exist.")
         if root_dir.exists() and not root_dir.is_dir():
@@ -46,39 +62,109 @@ class MeteoDataset(Dataset):
         self.start_year = DATASET_START_YEAR
         self.end_year = DATASET_END_YEAR
         self.data = self._load_data()
+        self.year_offsets = self._get_year_offsets()
+
+        self.array: Optional[np.ndarray] = None
+        self.mmap_path: Optional[Path] = None
+        if preload:
+            self.array = self._pack_data(self.data)
+        if mmap_dir is not None and self.array is not None:
+            self.mmap_path = self._save_array(self.array, mmap_dir)
+            self.array = np.load(self.mmap_path, mmap_mode="c")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Skip the dataframes when pickling a preloaded dataset (e.g. for DataLoader workers),
+        and the array itself when it is memory-mapped.
+        """
+        state = self.__dict__.copy()
+        if self.array is not None:
+            state["data"] = None
+        if self.mmap_path is not None:
+            state["array"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self.mmap_path is not None:
+            self.array = np.load(self.mmap_path, mmap_mode="c")
 
     def _load_data(self) -> Dict[int, Dict[str, pd.DataFrame]]:
         """
         Load data from the specified directory.
         """
         all_data: Dict[int, Dict[str, pd.DataFrame]] = defaultdict(dict)
+        self.source_signatures: Dict[str, list[int]] = {}
 
         for year in range(self.start_year, self.end_year + 1):
             for loc in self.location:
                 file_path = self.root_dir / str(year) / f"{loc}_weather_data.csv"
                 if file_path.exists():
-                    df = pd.read_csv(file_path)
+                    self.source_signatures[f"{year}/{loc}"] = get_file_signature(file_path)
+                    df = read_weather_csv(file_path)
                     all_data[year][loc] = df
 
         return all_data
 
-    def __len__(self) -> int:
-        total_days = 0
+    def _get_year_offsets(self) -> list[int]:
+        """
+        Get the cumulative number of days preceding each year.
+        The last element is the total number of days in the dataset.
+        """
+        year_offsets = [0]
         for year in range(self.start_year, self.end_year + 1):
-            total_days += self.data[year][self.location[0]].shape[0]
-        return total_days - self.input_len - self.output_len
+            year_offsets.append(year_offsets[-1] + self.data[year][self.location[0]].shape[0])
+        return year_offsets
+
+    def _pack_data(self, data: Dict[int, Dict[str, pd.DataFrame]]) -> np.ndarray:
+        """
+        Concatenate the yearly dataframes of every location into one contiguous array.
+        Returns:
+            np.ndarray: Array of shape (num_locations, total_days, num_features).
+        """
+        if self.target_location not in self.location:
+            raise ValueError("target_location should be one of the locations.")
+
+        years = range(self.start_year, self.end_year + 1)
+        sequences = [
+            np.concatenate([data[year][loc].to_numpy(dtype=np.float32) for year in years])
+            for loc in self.location
+        ]
+        if len({sequence.shape for sequence in sequences}) != 1:
+            raise ValueError("All locations should have the same number of days and features.")
+
+        return np.ascontiguousarray(np.stack(sequences))
+
+    def _save_array(self, array: np.ndarray, mmap_dir: Path) -> Path:
+        """
+        Save the preloaded array to a .npy file named after the dataset configuration and the
+        signatures of the source files, so a file is never replaced by different data while
+        workers are reading it. An existing file with the same name is reused.
+        """
+        mmap_dir.mkdir(parents=True, exist_ok=True)
+        config = f"{self.root_dir.resolve()}|{','.join(self.location)}|{self.start_year}"
+        config += f"-{self.end_year}|{json.dumps(self.source_signatures, sort_keys=True)}"
+        config_hash = hashlib.sha1(config.encode()).hexdigest()[:16]
+        mmap_path = mmap_dir / f"meteo_dataset_{config_hash}.npy"
+        if mmap_path.exists():
+            return mmap_path
+
+        tmp_path = mmap_dir / f"meteo_dataset_{config_hash}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, array)
+        tmp_path.replace(mmap_path)
+        return mmap_path
+
+    def __len__(self) -> int:
+        return self.year_offsets[-1] - self.input_len - self.output_len
 
     def _get_day(self, idx: int) -> tuple[int, int]:
         """
         Get the year and day corresponding to the index.
         """
         day = idx + self.input_len
-        year = self.start_year
-        while day >= self.data[year][self.location[0]].shape[0]:
-            day -= self.data[year][self.location[0]].shape[0]
-            year += 1
+        year_idx = bisect.bisect_right(self.year_offsets, day) - 1
 
-        return year, day
+        return self.start_year + year_idx, day - self.year_offsets[year_idx]
 
     def _get_sequence(
         self, year: int, start_day: int, end_day: int, locations: list[str]
@@ -121,6 +207,9 @@ class MeteoDataset(Dataset):
             tuple[torch.Tensor, torch.Tensor]: input_sequence, target_sequence
             In sizes (num_locations, input_length, num_features)
         """
+        if self.array is not None:
+            return self._get_preloaded_item(self.array, idx)
+
         year, day = self._get_day(idx)
 
         input_sequence = torch.tensor(self._get_input_sequence(year, day), dtype=torch.float32)
@@ -128,6 +217,68 @@ class MeteoDataset(Dataset):
 
         return input_sequence, target_sequence
 
+    def _get_preloaded_item(
+        self, array: np.ndarray, idx: int
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get the input and target sequences as zero-copy views of the preloaded array.
+        """
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("Index out of range.")
+
+        day = idx + self.input_len
+        target_idx = self.location.index(self.target_location)
+        input_sequence = array[:, day - self.input_len : day, :]
+        target_sequence = array[target_idx : target_idx + 1, day : day + self.output_len, :]
+
+        return torch.from_numpy(input_sequence), torch.from_numpy(target_sequence)
+
+    def get_batch(self, indices: list[int]) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get a whole batch of input and target sequences with one gather from the preloaded array.
+        Returns:
+            tuple[torch.Tensor, torch.Tensor]: input_batch, target_batch
+            In sizes (batch_size, num_locations, input_length, num_features)
+        """
+        if self.array is None:
+            return default_collate([self[idx] for idx in indices])
+
+        return gather_windows(
+            torch.from_numpy(self.array),
+            torch.as_tensor(indices),
+            self.input_len,
+            self.output_len,
+            self.location.index(self.target_location),
+        )
+
+
+def gather_windows(
+    series: torch.Tensor,
+    indices: torch.Tensor,
+    input_len: int,
+    output_len: int,
+    target_idx: int,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Gather the input and target windows of a batch from a sliding-window view of the series.
+    Args:
+        series (torch.Tensor): Series of shape (num_locations, total_days, num_features).
+        indices (torch.Tensor): Sample indices, the sample i starts on day i.
+        input_len (int): Number of days to look back.
+        output_len (int): Number of days to predict.
+        target_idx (int): Index of the target location in the series.
+    Returns:
+        tuple[torch.Tensor, torch.Tensor]: input_batch, target_batch
+    """
+    input_windows = series.unfold(1, input_len, 1)  # (L, D - input_len + 1, F, input_len)
+    target_windows = series[target_idx : target_idx + 1].unfold(1, output_len, 1)
+
+    inputs = input_windows[:, indices].permute(1, 0, 3, 2)
+    targets = target_windows[:, indices + input_len].permute(1, 0, 3, 2)
+    return inputs.contiguous(), targets.contiguous()
+
 
 if __name__ == "__main__":
     data = MeteoDataset()
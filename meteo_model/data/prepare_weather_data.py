@@ -4,6 +4,7 @@ from pathlib import Path
 from meteostat import Stations
 from meteo_model.station import WeatherStation
 from meteo_model.data.weather_data import stations_to_dict, get_weather_data
+from meteo_model.data.data_cache import write_stage_cache
 from meteo_model.utils.file_utils import sanitize_filename, prepare_directory, save_data_to_csv
 
 Stations.cache_dir = str(STATIONS_CACHE_DIR)
@@ -40,6 +41,7 @@ def process_location_data(
 def main():
     stations_dict = stations_to_dict(LOCATIONS)
     collect_and_save_weather_data(stations_dict, START_YEAR, END_YEAR, Path(BASE_PATH))
+    write_stage_cache(Path(BASE_PATH))
 
 
 if __name__ == "__main__":
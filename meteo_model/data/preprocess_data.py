@@ -1,13 +1,19 @@
 import os
 import json
+import argparse
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
+from typing import Iterable
 
 from meteo_model.data.get_stats import create_stat_file
 from meteo_model.data.normaliser import normalize_data
 from meteo_model.data.config import PATH_TO_STATS, LOCATIONS_NAMES, BASE_PATH, MEDIAN_DIR
 from meteo_model.utils.file_utils import get_station_name_from_city_name
 from meteo_model.data.data_cleaner import DataCleanerAndSaver
+from meteo_model.data.data_cache import read_weather_csv, update_stage_cache
+from meteo_model.data.preprocessing_manifest import PreprocessingManifest
 
 
 def get_raw_data(
@@ -18,20 +24,54 @@ def get_raw_data(
     """
     Load data from csv files and return a list of dataframes.
     """
-    data = []
+    data_paths = get_raw_data_paths(station, data_dir, year_range)
+    return [read_weather_csv(file_path) for file_path in data_paths], data_paths
+
+
+def get_raw_data_paths(
+    station: str,
+    data_dir: Path = Path(BASE_PATH),
+    year_range: tuple[int, int] = (2012, 2024),
+) -> list[Path]:
     data_paths = []
     for year in range(year_range[0], year_range[1] + 1):
         file_path = data_dir / str(year) / f"{station}_weather_data.csv"
         if file_path.exists():
-            data.append(pd.read_csv(file_path))
             data_paths.append(file_path)
-    return data, data_paths
+    return data_paths
 
 
-def clean_and_save_data(city_name: str):
+def clean_and_save_data(city_name: str, incremental: bool = False):
+    """
+    Clean the raw data of the city and save it, yielding progress messages.
+    In incremental mode, years whose raw file and median file did not change since they were
+    last processed are skipped. The median file is calculated from all years, so it is removed
+    and all years are processed again if any raw file changed since it was calculated, or if
+    it does not exist yet.
+    """
     station = get_station_name_from_city_name(city_name)
-    data, data_paths = get_raw_data(station)
-    yield f"{city_name}: {len(data)} files found."
+    median_dir = Path(MEDIAN_DIR)
+    median_dir.mkdir(parents=True, exist_ok=True)
+    median_file = median_dir / f"{station}.csv"
+
+    all_data_paths = get_raw_data_paths(station)
+    data_paths = all_data_paths
+    yield f"{city_name}: {len(data_paths)} files found."
+
+    manifest = PreprocessingManifest.for_station(station) if incremental else None
+    if manifest is not None and not manifest.is_up_to_date(median_file, all_data_paths):
+        median_file.unlink(missing_ok=True)
+    if manifest is not None and median_file.exists():
+        data_paths = [
+            path
+            for path in data_paths
+            if not manifest.is_up_to_date(
+                DataCleanerAndSaver.get_processed_path(path), [path, median_file]
+            )
+        ]
+        yield f"{city_name}: {len(data_paths)} files changed."
+
+    data = [read_weather_csv(file_path) for file_path in data_paths]
 
     cleaner = DataCleanerAndSaver(data, data_paths)
     cleaner.drop_columns()
@@ -40,21 +80,35 @@ def clean_and_save_data(city_name: str):
     cleaner.handle_NaN_based_on_trend()
     yield f"{city_name}: NaN handled based on trend."
 
-    median_dir = Path(MEDIAN_DIR)
-    median_dir.mkdir(parents=True, exist_ok=True)
-    cleaner.handle_NaN_based_on_sesonal_pattern(median_dir / f"{station}.csv")
+    cleaner.handle_NaN_based_on_sesonal_pattern(median_file)
     yield f"{city_name}: NaN handled based on seasonal pattern."
 
     cleaner.clip_snow()
     yield f"{city_name}: Snow values clipped."
 
     cleaner.save_data()
+    if manifest is not None:
+        for path in data_paths:
+            manifest.record(DataCleanerAndSaver.get_processed_path(path), [path, median_file])
+        manifest.record(median_file, all_data_paths)
+        manifest.save()
     yield f"{city_name}: Data saved."
 
 
-def prepocessing(cities: list[str]):
-    clean_data_for_(cities)
-    normalize_cleaned_data_for_(cities)
+def _clean_and_save_data_messages(city_name: str, incremental: bool = False) -> list[str]:
+    return list(clean_and_save_data(city_name, incremental))
+
+
+def prepocessing(cities: list[str], num_workers: int = 1, incremental: bool = False):
+    """
+    Clean and normalize the data of the given cities.
+    With num_workers > 1 the cities are processed in parallel in a process pool.
+    With incremental, only the station-years whose inputs changed are processed again.
+    """
+    clean_data_for_(cities, num_workers, incremental)
+    update_stage_cache(Path("data/processed/weather_data"))
+    normalize_cleaned_data_for_(cities, num_workers=num_workers, incremental=incremental)
+    update_stage_cache(Path("data/normalized"))
 
 
 def normalize_cleaned_data_station(
@@ -62,39 +116,90 @@ def normalize_cleaned_data_station(
     stats,
     data_dir: Path = Path("data/processed"),
     year_range: tuple[int, int] = (2012, 2024),
+    incremental: bool = False,
 ):
+    """
+    Normalize the cleaned data of the station. In incremental mode, years whose cleaned file
+    and stats file did not change since they were last normalized are skipped.
+    """
+    manifest = PreprocessingManifest.for_station(station) if incremental else None
     for year in range(year_range[0], year_range[1] + 1):
         input_file_path = data_dir / "weather_data" / str(year) / f"{station}_weather_data.csv"
         norm_year_data_dir = Path(str(data_dir).replace("processed", "normalized")) / str(year)
-        if not os.path.exists(norm_year_data_dir):
-            os.makedirs(norm_year_data_dir)
+        os.makedirs(norm_year_data_dir, exist_ok=True)
         output_file_path = norm_year_data_dir / f"{station}_weather_data.csv"
         if input_file_path.exists():
-            cleaned_df = pd.read_csv(input_file_path)
+            input_paths = [input_file_path, Path(PATH_TO_STATS)]
+            if manifest is not None and manifest.is_up_to_date(output_file_path, input_paths):
+                continue
+            cleaned_df = read_weather_csv(input_file_path)
             normalized_df = normalize_data(cleaned_df, stats)
             normalized_df.to_csv(output_file_path, index=False)
+            if manifest is not None:
+                manifest.record(output_file_path, input_paths)
+    if manifest is not None:
+        manifest.save()
 
 
 def normalize_cleaned_data_for_(
     cities: list[str],
     data_dir: Path = Path("data/processed"),
     year_range: tuple[int, int] = (2012, 2024),
+    num_workers: int = 1,
+    incremental: bool = False,
 ):
     if not Path(PATH_TO_STATS).exists():
         create_stat_file()
     with open(PATH_TO_STATS) as f:
         stats = json.load(f)
-    for station in cities:
-        normalize_cleaned_data_station(station, stats, data_dir, year_range)
-
-
-def clean_data_for_(cities: list[str]):
-    for city in cities:
-        for message in clean_and_save_data(city):
+    if num_workers > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            list(
+                executor.map(
+                    normalize_cleaned_data_station,
+                    cities,
+                    repeat(stats),
+                    repeat(data_dir),
+                    repeat(year_range),
+                    repeat(incremental),
+                )
+            )
+    else:
+        for station in cities:
+            normalize_cleaned_data_station(station, stats, data_dir, year_range, incremental)
+
+
+def clean_data_for_(cities: list[str], num_workers: int = 1, incremental: bool = False):
+    """
+    Clean the data of the given cities and print the progress messages of each city in order.
+    """
+    if num_workers > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            _print_messages(
+                executor.map(_clean_and_save_data_messages, cities, repeat(incremental))
+            )
+    else:
+        _print_messages(clean_and_save_data(city, incremental) for city in cities)
+
+
+def _print_messages(messages_per_city: Iterable[Iterable[str]]):
+    for messages in messages_per_city:
+        for message in messages:
             print(message)
         print(40 * "-")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean and normalize the weather data")
+    parser.add_argument(
+        "--num_workers", type=int, default=1, help="Number of cities processed in parallel"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process the station-years whose inputs changed since the last run",
+    )
+    args = parser.parse_args()
+
     cities = LOCATIONS_NAMES
-    prepocessing(cities)
+    prepocessing(cities, args.num_workers, args.incremental)
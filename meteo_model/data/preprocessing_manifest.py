@@ -0,0 +1,71 @@
+"""Manifest of the inputs used to produce each preprocessed file"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+from meteo_model.data.config import MANIFEST_DIR
+from meteo_model.utils.file_utils import get_file_hash, get_file_signature, prepare_directory
+
+
+class PreprocessingManifest:
+    def __init__(self, path: Path):
+        """
+        Records the signature (mtime and size) and hash of the input files of every output file,
+        so outputs whose inputs did not change can be skipped.
+
+        Args:
+            path (Path): Path to the JSON file of the manifest.
+        """
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    @classmethod
+    def for_station(cls, station: str) -> "PreprocessingManifest":
+        return cls(Path(MANIFEST_DIR) / f"{station}.json")
+
+    def is_up_to_date(self, output_path: Path, input_paths: list[Path]) -> bool:
+        """
+        Check if the output file exists and was produced from the current input files.
+        Inputs with a new mtime but unchanged content are still up to date.
+        """
+        entry = self.entries.get(str(output_path))
+        if entry is None or not output_path.exists():
+            return False
+        if set(entry) != {str(input_path) for input_path in input_paths}:
+            return False
+
+        for input_path in input_paths:
+            if not input_path.exists():
+                return False
+            recorded = entry[str(input_path)]
+            signature = get_file_signature(input_path)
+            if recorded["signature"] == signature:
+                continue
+            if recorded["hash"] != get_file_hash(input_path):
+                return False
+            recorded["signature"] = signature
+
+        return True
+
+    def record(self, output_path: Path, input_paths: list[Path]) -> None:
+        """
+        Record the current state of the input files of the output file.
+        """
+        self.entries[str(output_path)] = {
+            str(input_path): {
+                "signature": get_file_signature(input_path),
+                "hash": get_file_hash(input_path),
+            }
+            for input_path in input_paths
+        }
+
+    def save(self) -> None:
+        prepare_directory(self.path.parent)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=4)
+        tmp_path.replace(self.path)
@@ -0,0 +1,115 @@
+from meteo_model.utils.evaluation_utils import collect_predictions, compute_errors
+from meteo_model.utils.evaluation_utils import compute_horizon_errors
+from meteo_model.utils.model_utils import load_model
+from meteo_model.data.data_loader import BatchedSubset, collate_batch
+from meteo_model.data.datasets import MeteoDataset
+from meteo_model.serving_config import MAX_DAYS, MODELS_FOR_DAYS, SERVING_LOCATIONS
+from pathlib import Path
+import argparse
+import os
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader
+
+SPLIT_RATIO = 0.8
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare the per-horizon errors of one multi-horizon model with the "
+        "specialized models served for each number of days."
+    )
+    parser.add_argument("--model_name", type=str, required=True)
+    parser.add_argument("--model_version", type=int, required=True)
+    parser.add_argument("--input_len", type=int, required=True, help="Input length of the model")
+    parser.add_argument("--batch_size", type=int, default=16)
+    return parser.parse_args()
+
+
+def create_dataset(input_len: int, output_len: int) -> MeteoDataset:
+    return MeteoDataset(
+        root_dir=Path("data/normalized"),
+        location=SERVING_LOCATIONS,
+        input_len=input_len,
+        output_len=output_len,
+    )
+
+
+def get_test_start_days(dataset: MeteoDataset, split_ratio: float = SPLIT_RATIO) -> range:
+    """
+    Days of the first predicted day of the test samples, counted from the first day of the
+    data. Sample idx predicts the days following its input_len input days.
+    """
+    split_idx = int(split_ratio * len(dataset))
+    return range(split_idx + dataset.input_len, len(dataset) + dataset.input_len)
+
+
+def get_common_start_days(datasets: list[MeteoDataset]) -> range:
+    """
+    First predicted days of the test samples of every dataset, so models with different input
+    and output lengths are scored on the same target dates.
+    """
+    test_start_days = [get_test_start_days(dataset) for dataset in datasets]
+    return range(
+        max(start_days.start for start_days in test_start_days),
+        min(start_days.stop for start_days in test_start_days),
+    )
+
+
+def get_test_predictions(
+    model_name: str,
+    model_version: int,
+    dataset: MeteoDataset,
+    start_days: range,
+    batch_size: int,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
+    indices = range(start_days.start - dataset.input_len, start_days.stop - dataset.input_len)
+    test_dl = DataLoader(
+        BatchedSubset(dataset, indices),
+        batch_size=batch_size,
+        num_workers=os.cpu_count() or 1,
+        collate_fn=collate_batch,
+    )
+    model = load_model(model_name, model_version, map_location=device)
+    predictions, targets, _ = collect_predictions(model, test_dl, device)
+    return predictions, targets
+
+
+def main():
+    args = parse_arguments()
+    models = {"Multi-horizon": (args.model_name, args.model_version, args.input_len, MAX_DAYS)}
+    for n_days, (model_name, model_version, input_len) in MODELS_FOR_DAYS.items():
+        models[n_days] = (model_name, model_version, input_len, n_days)
+
+    datasets = {
+        key: create_dataset(input_len, output_len)
+        for key, (_, _, input_len, output_len) in models.items()
+    }
+    start_days = get_common_start_days(list(datasets.values()))
+    print(f"Scoring {len(start_days)} common test samples.")
+
+    predictions = {
+        key: get_test_predictions(
+            model_name, model_version, datasets[key], start_days, args.batch_size
+        )
+        for key, (model_name, model_version, _, _) in models.items()
+    }
+    multi_horizon = compute_horizon_errors(*predictions.pop("Multi-horizon"), MAX_DAYS)
+    specialized = {
+        n_days: compute_errors(*n_days_predictions)
+        for n_days, n_days_predictions in predictions.items()
+    }
+
+    results = pd.concat(
+        {
+            "Specialized": pd.DataFrame.from_dict(specialized, orient="index"),
+            "Multi-horizon": multi_horizon,
+        },
+        axis=1,
+    )
+    print(results.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from meteo_model.utils.model_utils import load_model, log_torchscript_model
+from mlflow import MlflowClient
+import argparse
+import mlflow
+import torch
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Log the TorchScript export of a registered model to its MLflow run."
+    )
+    parser.add_argument("--model_name", type=str, required=True)
+    parser.add_argument("--model_version", type=int, required=True)
+    parser.add_argument("--input_len", type=int, required=True, help="Input length of the model")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    model = load_model(args.model_name, args.model_version, map_location="cpu")
+    example_input = torch.zeros(1, model.num_locations, args.input_len, model.num_features)
+
+    run_id = MlflowClient().get_model_version(args.model_name, str(args.model_version)).run_id
+    with mlflow.start_run(run_id=run_id):
+        log_torchscript_model(model, example_input)
+    print(f"TorchScript export of {args.model_name} version {args.model_version} logged.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 from meteo_model.model.base_model import BaseWeatherModel
 from torch.nn import LSTM
 from torch import nn
+from typing import Optional, cast
 import torch
 
+LSTMState = list[tuple[torch.Tensor, torch.Tensor]]
+# Flat weights of the fused LSTM of all locations and the final linear weight and bias of all
+# locations, stacked along the first dimension.
+StackedWeights = tuple[list[torch.Tensor], torch.Tensor, torch.Tensor]
+
 
 class WeatherModelLSTM(BaseWeatherModel):
     def __init__(
@@ -37,31 +43,57 @@ class WeatherModelLSTM(BaseWeatherModel):
         )
         self.final_fc = nn.Linear(num_locations, 1)
 
+    # Class attribute, so models pickled before the option existed still load.
+    stateful_decoding = False
+
     def process_locations(self, x: torch.Tensor) -> torch.Tensor:
         """
         Process input data for each location using the corresponding LSTM model.
         """
+        return self.process_locations_with_state(x)[0]
+
+    def stack_weights(self) -> Optional[StackedWeights]:
+        """
+        Weights prepared once per forward and passed to every process_locations_with_state
+        call. The per-location model uses its submodels directly.
+        """
+        return None
+
+    def process_locations_with_state(
+        self,
+        x: torch.Tensor,
+        state: Optional[LSTMState] = None,
+        weights: Optional[StackedWeights] = None,
+    ) -> tuple[torch.Tensor, LSTMState]:
+        """
+        Process input data for each location starting from the given (h, c) state of every
+        location LSTM. Returns the outputs and the final state.
+        """
         outputs = []
+        new_state = []
         for i, submodel in enumerate(self.submodels):
             location_input = x[:, i, :, :]
-            lstm, fc = submodel[0], submodel[1]
-            output, _ = lstm(location_input)  # (B, L, H)
+            lstm, fc = cast(nn.Sequential, submodel)[0], cast(nn.Sequential, submodel)[1]
+            output, location_state = lstm(
+                location_input, None if state is None else state[i]
+            )  # (B, L, H)
             final_output = fc(output)  # (B, L, F)
             outputs.append(final_output)
+            new_state.append(location_state)
 
         stacked_outputs = torch.stack(outputs, dim=1)
-        return stacked_outputs
+        return stacked_outputs, new_state
 
-    def forward(self, X: torch.Tensor) -> torch.Tensor:
+    def decode_sliding_window(
+        self, X: torch.Tensor, weights: Optional[StackedWeights] = None
+    ) -> torch.Tensor:
         """
-        Iteratively predicts output_len steps for the given input data.
+        Predicts each step from the last input_len steps, running the LSTM over the whole window
+        for each of the output_len steps.
         """
         predictions: list[torch.Tensor] = []
-        if X.dim() == 3:
-            X = X.unsqueeze(0)
-
         for _ in range(self.output_len):
-            yhat = self.process_locations(X)
+            yhat = self.process_locations_with_state(X, weights=weights)[0]
             yhat = yhat[:, :, -1, :]
             predictions.append(yhat.unsqueeze(2))
 
@@ -69,10 +101,134 @@ class WeatherModelLSTM(BaseWeatherModel):
             new_X[:, :, -1, :] = yhat
             X = new_X
 
-        predictions_tensor = torch.cat(predictions, dim=2)
+        return torch.cat(predictions, dim=2)
+
+    def decode_stateful(
+        self, X: torch.Tensor, weights: Optional[StackedWeights] = None
+    ) -> torch.Tensor:
+        """
+        Encodes the input once and predicts each next step from the carried (h, c) state and the
+        last prediction. Unlike decode_sliding_window, the oldest input steps are never dropped,
+        so the predictions differ slightly.
+        """
+        yhat, state = self.process_locations_with_state(X, weights=weights)
+        predictions = [yhat[:, :, -1:, :]]
+        for _ in range(self.output_len - 1):
+            yhat, state = self.process_locations_with_state(predictions[-1], state, weights)
+            predictions.append(yhat)
+
+        return torch.cat(predictions, dim=2)
+
+    def forward(self, X: torch.Tensor) -> torch.Tensor:
+        """
+        Iteratively predicts output_len steps for the given input data.
+        Uses decode_stateful if stateful_decoding is set, decode_sliding_window otherwise.
+        """
+        if X.dim() == 3:
+            X = X.unsqueeze(0)
+
+        weights = self.stack_weights()
+        if self.stateful_decoding:
+            predictions_tensor = self.decode_stateful(X, weights)
+        else:
+            predictions_tensor = self.decode_sliding_window(X, weights)
 
         predictions_tensor = predictions_tensor.permute(0, 2, 3, 1)
         final_output = self.final_fc(predictions_tensor)
         final_output = final_output.permute(0, 3, 1, 2)
 
         return final_output
+
+
+class GroupedWeatherModelLSTM(WeatherModelLSTM):
+    """
+    WeatherModelLSTM evaluating the LSTMs of all locations with one fused LSTM call.
+    The parameters are the same as in WeatherModelLSTM, so checkpoints of both are
+    interchangeable. The per-location weights are placed on the diagonal of the weights of one
+    LSTM with a hidden size of num_locations * hidden_size, so cuDNN runs all locations in a
+    single kernel per layer instead of one LSTM call per location. That costs num_locations
+    times the FLOPs of the per-location LSTMs and num_locations**2 times the weight memory, so
+    the fused LSTM is only used on CUDA by default, on CPU the per-location LSTMs are faster.
+    """
+
+    # Use the fused LSTM. None uses it for models on CUDA only.
+    fused: Optional[bool] = None
+
+    def _stacked_parameters(self, name: str, module_idx: int) -> torch.Tensor:
+        return torch.stack(
+            [
+                getattr(cast(nn.Sequential, submodel)[module_idx], name)
+                for submodel in self.submodels
+            ]
+        )
+
+    def _block_diagonal(self, weights: torch.Tensor) -> torch.Tensor:
+        """
+        Place the (N, 4H, I) gate weights of all locations on the diagonal of the (4NH, NI)
+        weights of the fused LSTM, keeping the input, forget, cell, output gate order.
+        """
+        gates = weights.unflatten(1, (4, self.hidden_size)).unbind(1)  # 4 x (N, H, I)
+        return torch.cat([torch.block_diag(*gate.unbind(0)) for gate in gates])
+
+    def stack_weights(self) -> Optional[StackedWeights]:
+        """
+        Build the fused LSTM weights and stack the linear weights of all locations, once per
+        forward instead of once per decoding step. Returns None if the fused LSTM is not used.
+        """
+        fused = self.fused
+        if fused is None:
+            fused = self.final_fc.weight.is_cuda
+        if not fused:
+            return None
+
+        lstm_weights = []
+        for layer in range(self.num_layers):
+            for name in (f"weight_ih_l{layer}", f"weight_hh_l{layer}"):
+                lstm_weights.append(self._block_diagonal(self._stacked_parameters(name, 0)))
+            for name in (f"bias_ih_l{layer}", f"bias_hh_l{layer}"):
+                bias = self._stacked_parameters(name, 0)  # (N, 4H)
+                lstm_weights.append(bias.unflatten(1, (4, -1)).transpose(0, 1).flatten())
+        fc_weight = self._stacked_parameters("weight", 1)  # (N, F, H)
+        fc_bias = self._stacked_parameters("bias", 1)  # (N, F)
+        return lstm_weights, fc_weight, fc_bias
+
+    def process_locations_with_state(
+        self,
+        x: torch.Tensor,
+        state: Optional[LSTMState] = None,
+        weights: Optional[StackedWeights] = None,
+    ) -> tuple[torch.Tensor, LSTMState]:
+        """
+        Process input data for all locations with one call of the fused LSTM. Falls back to
+        the per-location LSTMs if no fused weights are given.
+        """
+        if weights is None:
+            return super().process_locations_with_state(x, state)
+
+        lstm_weights, fc_weight, fc_bias = weights
+        batch_size, num_locations, seq_len, _ = x.shape
+        lstm_input = x.transpose(1, 2).flatten(2)  # (B, L, N * F)
+        if state is None:
+            h0 = x.new_zeros(self.num_layers, batch_size, num_locations * self.hidden_size)
+            c0 = h0
+        else:
+            h0 = torch.stack([h for h, _ in state], dim=2).flatten(2)
+            c0 = torch.stack([c for _, c in state], dim=2).flatten(2)
+
+        output, h, c = torch.lstm(
+            lstm_input,
+            (h0, c0),
+            lstm_weights,
+            True,  # has_biases
+            self.num_layers,
+            0.0,  # dropout
+            self.training,
+            False,  # bidirectional
+            True,  # batch_first
+        )
+        output = output.unflatten(2, (num_locations, self.hidden_size))  # (B, L, N, H)
+        output = torch.einsum("blnh,nfh->bnlf", output, fc_weight) + fc_bias[:, None, :]
+
+        h_by_location = h.unflatten(2, (num_locations, self.hidden_size)).unbind(2)
+        c_by_location = c.unflatten(2, (num_locations, self.hidden_size)).unbind(2)
+        return output, list(zip(h_by_location, c_by_location))  # (B, N, L, F)
@@ -1,10 +1,93 @@
+from abc import abstractmethod
 from meteo_model.model.base_model import BaseWeatherModel
 from pytorch_tcn import TCN
+from pytorch_tcn.conv import TemporalConv1d
+from pytorch_tcn.tcn import TemporalBlock
 from torch import nn
+from torch.nn.utils import parametrize
+from torch.nn.utils.parametrizations import weight_norm
+from typing import Any, Optional, cast
 import torch
+import torch.nn.functional as F
 
+BlockBuffers = list[torch.Tensor]
+TCNBuffers = list[BlockBuffers]
 
-class WeatherModelTCN(BaseWeatherModel):
+
+def pad_with_buffer(
+    x: torch.Tensor, pad_len: int, buffer: Optional[torch.Tensor] = None
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Left pad x (B, C, L) for a causal convolution with the buffer holding the last inputs of
+    the previous call, or with zeros if there is none. Returns the padded input and the new
+    buffer.
+    """
+    if buffer is None:
+        x = F.pad(x, (pad_len, 0))
+    else:
+        x = torch.cat([buffer, x], dim=2)
+    buffer_start = x.shape[2] - pad_len
+    return x, x[:, :, buffer_start:]
+
+
+def causal_conv_with_buffer(
+    conv: TemporalConv1d, x: torch.Tensor, buffer: Optional[torch.Tensor] = None
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Apply the causal convolution to x (B, C, L), prepending the buffer holding the last inputs
+    of the previous call instead of zero padding. Returns the output and the new buffer.
+    """
+    x, new_buffer = pad_with_buffer(x, conv.pad_len, buffer)
+    return nn.Conv1d.forward(conv, x), new_buffer
+
+
+def temporal_block_with_buffers(
+    block: TemporalBlock, x: torch.Tensor, buffers: Optional[BlockBuffers] = None
+) -> tuple[torch.Tensor, BlockBuffers]:
+    """
+    TemporalBlock.forward continuing from the buffers of both of its convolutions.
+    """
+    out, buffer_1 = causal_conv_with_buffer(
+        block.conv1, x, None if buffers is None else buffers[0]
+    )
+    out = block.apply_norm(block.norm1, out)
+    out = block.dropout1(block.activation1(out))
+    out, buffer_2 = causal_conv_with_buffer(
+        block.conv2, out, None if buffers is None else buffers[1]
+    )
+    out = block.apply_norm(block.norm2, out)
+    out = block.dropout2(block.activation2(out))
+    res = x if block.downsample is None else block.downsample(x)
+    return block.activation_final(out + res), [buffer_1, buffer_2]
+
+
+def tcn_with_buffers(
+    tcn: TCN, x: torch.Tensor, buffers: Optional[TCNBuffers] = None
+) -> tuple[torch.Tensor, TCNBuffers]:
+    """
+    Run the TCN on x (B, L, C) continuing the sequence of the previous call, whose convolution
+    inputs are kept in the buffers. Unlike the streaming mode of pytorch_tcn, any batch size is
+    supported and the buffers are not stored in the modules.
+    """
+    if tcn.use_skip_connections or tcn.projection_out is not None or tcn.embedding_shapes:
+        raise ValueError(
+            "Buffered inference supports only TCNs without skip connections, "
+            "output projection and embeddings."
+        )
+
+    x = x.transpose(1, 2)
+    new_buffers = []
+    for i, block in enumerate(tcn.network):
+        x, block_buffers = temporal_block_with_buffers(
+            block, x, None if buffers is None else buffers[i]
+        )
+        new_buffers.append(block_buffers)
+    if tcn.activation_out is not None:
+        x = tcn.activation_out(x)
+    return x.transpose(1, 2), new_buffers
+
+
+class BaseWeatherModelTCN(BaseWeatherModel):
     def __init__(
         self,
         num_features: int,
@@ -15,7 +98,7 @@ class WeatherModelTCN(BaseWeatherModel):
         dropout: float,
     ):
         """
-        Initialize the WeatherModelTCN using pytorch_tcn.
+        Decoding shared by the per-location and the grouped TCN models.
         Args:
             num_features (int): The number of features in the input data.
             num_locations (int): The number of locations in the input data.
@@ -27,7 +110,120 @@ class WeatherModelTCN(BaseWeatherModel):
         self.num_channels = num_channels
         self.kernel_size = kernel_size
         self.dropout = dropout
-        super(WeatherModelTCN, self).__init__(num_features, num_locations, output_len)
+        super(BaseWeatherModelTCN, self).__init__(num_features, num_locations, output_len)
+
+    final_fc: nn.Linear
+
+    # Class attribute, so models pickled before the option existed still load.
+    streaming_decoding = False
+
+    @property
+    def receptive_field(self) -> int:
+        """
+        Number of input steps the last output depends on, with the default TCN dilations.
+        """
+        dilations = [2**i for i in range(len(self.num_channels))]
+        return 1 + sum(2 * (self.kernel_size - 1) * dilation for dilation in dilations)
+
+    def supports_streaming_decoding(self, input_len: int) -> bool:
+        """
+        Check if decode_streaming gives the same predictions as decode_sliding_window for
+        inputs of input_len steps, which requires the receptive field to fit in the input.
+        The default num_channels [9, 2, 1, 2, 9] with kernel_size 2 have a receptive field of
+        63 steps, longer than any served or tuned input length (at most 32), so only TCNs with
+        fewer layers or smaller kernels can use streaming decoding.
+        """
+        return self.receptive_field <= input_len
+
+    @abstractmethod
+    def process_locations(self, x: torch.Tensor) -> torch.Tensor:
+        pass
+
+    @abstractmethod
+    def process_locations_with_buffers(
+        self, x: torch.Tensor, buffers: Optional[Any] = None
+    ) -> tuple[torch.Tensor, Any]:
+        pass
+
+    def decode_sliding_window(self, X: torch.Tensor) -> torch.Tensor:
+        """
+        Predicts each step from the last input_len steps, running the TCN over the whole window
+        for each of the output_len steps.
+        """
+        predictions: list[torch.Tensor] = []
+        for _ in range(self.output_len):
+            yhat = self.process_locations(X)
+            yhat = yhat[:, :, -1, :]
+            predictions.append(yhat.unsqueeze(2))
+
+            new_X = torch.roll(X, shifts=-1, dims=2).clone()
+            new_X[:, :, -1, :] = yhat
+            X = new_X
+
+        return torch.cat(predictions, dim=2)
+
+    def decode_streaming(self, X: torch.Tensor) -> torch.Tensor:
+        """
+        Runs the TCN once over the input and then advances one step at a time, reusing the cached
+        inputs of every dilated convolution. The predictions are the same as with
+        decode_sliding_window only if supports_streaming_decoding holds for the input length.
+        Otherwise the sliding window drops input steps the streamed outputs still depend on,
+        and the intermediate activations of the window cannot be cached, as every window pads
+        each layer with zeros at its own start.
+        """
+        # The weight norm of every convolution is computed once instead of at every step.
+        with parametrize.cached():
+            yhat, buffers = self.process_locations_with_buffers(X)
+            predictions = [yhat[:, :, -1:, :]]
+            for _ in range(self.output_len - 1):
+                yhat, buffers = self.process_locations_with_buffers(predictions[-1], buffers)
+                predictions.append(yhat)
+
+        return torch.cat(predictions, dim=2)
+
+    def forward(self, X: torch.Tensor) -> torch.Tensor:
+        """
+        Iteratively predicts output_len steps for the given input data.
+        Uses decode_streaming if streaming_decoding is set, decode_sliding_window otherwise.
+        """
+        if X.dim() == 3:
+            X = X.unsqueeze(0)
+
+        if self.streaming_decoding:
+            predictions_tensor = self.decode_streaming(X)
+        else:
+            predictions_tensor = self.decode_sliding_window(X)
+
+        predictions_tensor = predictions_tensor.permute(0, 2, 3, 1)
+        final_output = self.final_fc(predictions_tensor)
+        final_output = final_output.permute(0, 3, 1, 2)
+
+        return final_output
+
+
+class WeatherModelTCN(BaseWeatherModelTCN):
+    def __init__(
+        self,
+        num_features: int,
+        num_locations: int,
+        output_len: int,
+        num_channels: list[int],
+        kernel_size: int,
+        dropout: float,
+    ):
+        """
+        Initialize the WeatherModelTCN using pytorch_tcn.
+        Args:
+            num_features (int): The number of features in the input data.
+            num_locations (int): The number of locations in the input data.
+            output_len (int): The number of days to predict.
+            num_channels (list): The number of channels for each TCN layer.
+            kernel_size (int): The kernel size for the TCN.
+            dropout (float): Dropout rate for regularization.
+        """
+        super(WeatherModelTCN, self).__init__(
+            num_features, num_locations, output_len, num_channels, kernel_size, dropout
+        )
 
         self.submodels = nn.ModuleList(
             [
@@ -57,27 +253,173 @@ class WeatherModelTCN(BaseWeatherModel):
         stacked_outputs = torch.stack(outputs, dim=1)
         return stacked_outputs
 
-    def forward(self, X: torch.Tensor) -> torch.Tensor:
+    def process_locations_with_buffers(
+        self, x: torch.Tensor, buffers: Optional[list[TCNBuffers]] = None
+    ) -> tuple[torch.Tensor, list[TCNBuffers]]:
         """
-        Iteratively predicts output_len steps for the given input data.
+        Process input data for each location continuing from the given convolution buffers of
+        every location TCN. Returns the outputs and the new buffers.
         """
-        predictions: list[torch.Tensor] = []
-        if X.dim() == 3:
-            X = X.unsqueeze(0)
+        outputs = []
+        new_buffers = []
+        for i, tcn in enumerate(self.submodels):
+            output, location_buffers = tcn_with_buffers(
+                tcn, x[:, i, :, :], None if buffers is None else buffers[i]
+            )
+            outputs.append(output)
+            new_buffers.append(location_buffers)
 
-        for _ in range(self.output_len):
-            yhat = self.process_locations(X)
-            yhat = yhat[:, :, -1, :]
-            predictions.append(yhat.unsqueeze(2))
+        stacked_outputs = torch.stack(outputs, dim=1)
+        return stacked_outputs, new_buffers
 
-            new_X = torch.roll(X, shifts=-1, dims=2).clone()
-            new_X[:, :, -1, :] = yhat
-            X = new_X
 
-        predictions_tensor = torch.cat(predictions, dim=2)
+class GroupedTemporalBlock(nn.Module):
+    def __init__(
+        self,
+        num_groups: int,
+        n_inputs: int,
+        n_outputs: int,
+        kernel_size: int,
+        dilation: int,
+        dropout: float,
+    ):
+        """
+        TemporalBlock of pytorch_tcn (weight norm, ReLU) for num_groups independent sequences
+        packed in the channel dimension, computed with grouped convolutions.
+        """
+        super(GroupedTemporalBlock, self).__init__()
+        self.pad_len = (kernel_size - 1) * dilation
+        self.conv1 = weight_norm(
+            nn.Conv1d(
+                num_groups * n_inputs,
+                num_groups * n_outputs,
+                kernel_size,
+                dilation=dilation,
+                groups=num_groups,
+            )
+        )
+        self.conv2 = weight_norm(
+            nn.Conv1d(
+                num_groups * n_outputs,
+                num_groups * n_outputs,
+                kernel_size,
+                dilation=dilation,
+                groups=num_groups,
+            )
+        )
+        self.dropout1 = nn.Dropout(dropout)
+        self.dropout2 = nn.Dropout(dropout)
+        self.downsample = (
+            nn.Conv1d(num_groups * n_inputs, num_groups * n_outputs, 1, groups=num_groups)
+            if n_inputs != n_outputs
+            else None
+        )
 
-        predictions_tensor = predictions_tensor.permute(0, 2, 3, 1)
-        final_output = self.final_fc(predictions_tensor)
-        final_output = final_output.permute(0, 3, 1, 2)
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.forward_with_buffers(x)[0]
 
-        return final_output
+    def forward_with_buffers(
+        self, x: torch.Tensor, buffers: Optional[BlockBuffers] = None
+    ) -> tuple[torch.Tensor, BlockBuffers]:
+        """
+        Forward continuing from the buffers of both convolutions, see pad_with_buffer.
+        """
+        out, buffer_1 = pad_with_buffer(x, self.pad_len, None if buffers is None else buffers[0])
+        out = self.dropout1(torch.relu(self.conv1(out)))
+        out, buffer_2 = pad_with_buffer(out, self.pad_len, None if buffers is None else buffers[1])
+        out = self.dropout2(torch.relu(self.conv2(out)))
+        res = x if self.downsample is None else self.downsample(x)
+        return torch.relu(out + res), [buffer_1, buffer_2]
+
+
+class GroupedWeatherModelTCN(BaseWeatherModelTCN):
+    def __init__(
+        self,
+        num_features: int,
+        num_locations: int,
+        output_len: int,
+        num_channels: list[int],
+        kernel_size: int,
+        dropout: float,
+    ):
+        """
+        WeatherModelTCN with the TCNs of all locations packed into the channel dimension, so
+        one stack of grouped convolutions (groups=num_locations) handles every location at once.
+        Use from_per_location to convert the weights of a WeatherModelTCN.
+        Args:
+            num_features (int): The number of features in the input data.
+            num_locations (int): The number of locations in the input data.
+            output_len (int): The number of days to predict.
+            num_channels (list): The number of channels for each TCN layer.
+            kernel_size (int): The kernel size for the TCN.
+            dropout (float): Dropout rate for regularization.
+        """
+        super(GroupedWeatherModelTCN, self).__init__(
+            num_features, num_locations, output_len, num_channels, kernel_size, dropout
+        )
+
+        self.network = nn.Sequential(
+            *[
+                GroupedTemporalBlock(
+                    num_groups=num_locations,
+                    n_inputs=num_features if i == 0 else num_channels[i - 1],
+                    n_outputs=out_channels,
+                    kernel_size=kernel_size,
+                    dilation=2**i,
+                    dropout=dropout,
+                )
+                for i, out_channels in enumerate(num_channels)
+            ]
+        )
+        self.final_fc = nn.Linear(num_locations, 1)
+
+    @classmethod
+    def from_per_location(cls, model: WeatherModelTCN) -> "GroupedWeatherModelTCN":
+        """
+        Create a GroupedWeatherModelTCN computing the same predictions as the given model.
+        The weights of every grouped layer are the weights of the per-location layers
+        concatenated along the output channels.
+        """
+        grouped = cls(
+            model.num_features,
+            model.num_locations,
+            model.output_len,
+            model.num_channels,
+            model.kernel_size,
+            model.dropout,
+        )
+        source = model.state_dict()
+        state_dict = {}
+        for key in grouped.state_dict():
+            if key.startswith("final_fc."):
+                state_dict[key] = source[key]
+            else:
+                state_dict[key] = torch.cat(
+                    [source[f"submodels.{i}.{key}"] for i in range(model.num_locations)]
+                )
+        grouped.load_state_dict(state_dict)
+        return grouped.to(next(model.parameters()).device)
+
+    def process_locations(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Process input data of all locations with the grouped convolutions.
+        """
+        return self.process_locations_with_buffers(x)[0]
+
+    def process_locations_with_buffers(
+        self, x: torch.Tensor, buffers: Optional[TCNBuffers] = None
+    ) -> tuple[torch.Tensor, TCNBuffers]:
+        """
+        Process input data of all locations continuing from the given buffers of every grouped
+        block. Returns the outputs and the new buffers.
+        """
+        batch_size, num_locations, seq_len, num_features = x.shape
+        x = x.transpose(2, 3).reshape(batch_size, num_locations * num_features, seq_len)
+        new_buffers = []
+        for i, block in enumerate(self.network):
+            x, block_buffers = cast(GroupedTemporalBlock, block).forward_with_buffers(
+                x, None if buffers is None else buffers[i]
+            )
+            new_buffers.append(block_buffers)
+        output = x.view(batch_size, num_locations, -1, seq_len).transpose(2, 3)
+        return output, new_buffers  # (B, N, L, C)
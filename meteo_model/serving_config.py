@@ -0,0 +1,71 @@
+import os
+from typing import Optional
+
+SERVING_LOCATIONS = ["WARSAW", "WROCLAW", "POZNAN", "KRAKOW", "BIALYSTOK"]
+MAX_DAYS = 8
+
+# n_days: (registered model name, model version or None for the latest one, input length)
+# All versions are pinned, so only a MULTI_HORIZON_MODEL with the "latest" version is
+# reloaded when a new version is registered.
+MODELS_FOR_DAYS: dict[int, tuple[str, Optional[int], int]] = {
+    1: ("MeteoModel-1_day", 2, 16),
+    2: ("MeteoModel-2_days", 1, 6),
+    3: ("MeteoModel-3_days", 1, 5),
+    4: ("MeteoModel-4_days", 1, 10),
+    5: ("MeteoModel-5_days", 1, 28),
+    6: ("MeteoModel-6_days", 2, 6),
+    7: ("MeteoModel-7_days", 2, 12),
+    8: ("MeteoModel-8_days", 2, 7),
+}
+
+
+ServingModel = tuple[str, Optional[int], int]
+
+
+def get_multi_horizon_model() -> Optional[ServingModel]:
+    """
+    Model serving every horizon, configured as <name>:<version>:<input length> in the
+    MULTI_HORIZON_MODEL environment variable, with "latest" as version to follow new registered
+    versions. Its output_len must be at least MAX_DAYS.
+    """
+    value = os.getenv("MULTI_HORIZON_MODEL")
+    if not value:
+        return None
+    name, version, input_len = value.rsplit(":", 2)
+    return name, None if version == "latest" else int(version), int(input_len)
+
+
+def check_multi_horizon_output_len(model_name: str, output_len: int) -> None:
+    """
+    Raise a ValueError if the model is the multi-horizon model and predicts less than MAX_DAYS.
+    """
+    multi_horizon_model = get_multi_horizon_model()
+    if multi_horizon_model is not None and multi_horizon_model[0] == model_name:
+        if output_len < MAX_DAYS:
+            raise ValueError(
+                f"Multi-horizon model {model_name} predicts {output_len} days, "
+                f"it must predict at least {MAX_DAYS}."
+            )
+
+
+def get_model_for_days(n_days: int) -> ServingModel:
+    return get_multi_horizon_model() or MODELS_FOR_DAYS[n_days]
+
+
+def get_input_len(model_name: str) -> int:
+    """
+    Input length of the served model, which is fixed for every registered model.
+    """
+    for n_days in range(1, MAX_DAYS + 1):
+        name, _, input_len = get_model_for_days(n_days)
+        if name == model_name:
+            return input_len
+    raise KeyError(f"Model {model_name} is not served.")
+
+
+def get_serving_models() -> list[tuple[str, Optional[int]]]:
+    """
+    Names and versions of all models the API serves.
+    """
+    models = {get_model_for_days(n_days)[:2] for n_days in range(1, MAX_DAYS + 1)}
+    return sorted(models, key=str)
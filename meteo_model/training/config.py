@@ -1,2 +1,4 @@
 OPTUNA_STORAGE_PATH_LSTM = "sqlite:///weather_model_lstm.db"
 OPTUNA_STORAGE_PATH_TCN = "sqlite:///weather_model_TCN.db"
+EARLY_STOPPING_PATIENCE = 3
+DEFAULT_PRUNER = "median"
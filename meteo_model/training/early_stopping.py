@@ -0,0 +1,44 @@
+"""Early stopping on the test loss with tracking of the best model weights"""
+
+import copy
+from typing import Any, Optional
+
+import torch
+
+
+class EarlyStopping:
+    def __init__(self, patience: int, min_delta: float = 0.0):
+        """
+        Stops the training when the test loss has not improved by more than min_delta for
+        patience epochs, keeping an in-memory copy of the weights of the best epoch.
+
+        Args:
+            patience (int): Number of epochs without improvement before stopping.
+            min_delta (float): Minimal decrease of the loss counted as an improvement.
+        """
+        self.patience = patience
+        self.min_delta = min_delta
+        self.best_loss = float("inf")
+        self.best_epoch = -1
+        self.best_state: Optional[dict[str, Any]] = None
+        self.epochs_without_improvement = 0
+
+    def step(self, loss: float, model: torch.nn.Module, epoch: int) -> bool:
+        """
+        Record the test loss of the epoch. Returns True if the training should stop.
+        """
+        if loss < self.best_loss - self.min_delta:
+            self.best_loss = loss
+            self.best_epoch = epoch
+            self.best_state = copy.deepcopy(model.state_dict())
+            self.epochs_without_improvement = 0
+        else:
+            self.epochs_without_improvement += 1
+        return self.epochs_without_improvement >= self.patience
+
+    def restore_best(self, model: torch.nn.Module) -> None:
+        """
+        Load the weights of the best epoch into the model.
+        """
+        if self.best_state is not None:
+            model.load_state_dict(self.best_state)
@@ -1,8 +1,9 @@
 import torch
 import math
 from tqdm.auto import tqdm
+from meteo_model.training.early_stopping import EarlyStopping
 from meteo_model.utils.training_utils import mlflow_logging
-from typing import Optional
+from typing import Callable, Optional
 
 
 @mlflow_logging
@@ -17,7 +18,25 @@ def train(
     enable_logging: bool = True,
     experiment_name: str = "MeteoModelForecasting",
     scheduler: Optional[torch.optim.lr_scheduler.ReduceLROnPlateau] = None,
+    amp: bool = False,
+    early_stopping_patience: Optional[int] = None,
+    early_stopping_min_delta: float = 0.0,
+    epoch_callback: Optional[Callable[[int, dict[str, float]], None]] = None,
 ) -> dict[str, list[float]]:
+    """
+    Train the model for the given number of epochs, evaluating it after each epoch.
+    With amp, the forward passes run under torch.autocast in the dtype from get_amp_dtype,
+    with gradient scaling when it is float16.
+    With early_stopping_patience, the training stops once Test_MSE has not improved by more
+    than early_stopping_min_delta for that many epochs, and the weights of the best epoch are
+    restored. The results then only contain the epochs that were run.
+    epoch_callback is called after every epoch with the epoch number and its metrics.
+    """
+    early_stopping = None
+    if early_stopping_patience is not None:
+        early_stopping = EarlyStopping(early_stopping_patience, early_stopping_min_delta)
+    amp_dtype = get_amp_dtype(device) if amp else None
+    scaler = torch.amp.GradScaler(torch.device(device).type, enabled=amp_dtype == torch.float16)
 
     results: dict[str, list[float]] = {
         "Train_MSE": [],
@@ -34,9 +53,15 @@ def train(
             optimizer=optimizer,
             loss_fn=loss_fn,
             device=device,
+            amp_dtype=amp_dtype,
+            scaler=scaler,
         )
         test_mse, test_mae, test_rmse = test_step(
-            model=model, test_dataloader=test_dataloader, loss_fn=loss_fn, device=device
+            model=model,
+            test_dataloader=test_dataloader,
+            loss_fn=loss_fn,
+            device=device,
+            amp_dtype=amp_dtype,
         )
         results["Train_MSE"].append(train_mse)
         results["Test_MSE"].append(test_mse)
@@ -45,37 +70,74 @@ def train(
         results["Train_RMSE"].append(train_rmse)
         results["Test_RMSE"].append(test_rmse)
 
+        if epoch_callback:
+            epoch_callback(epoch, {key: values[-1] for key, values in results.items()})
+
         if scheduler:
             scheduler.step(test_mse)
 
+        if early_stopping and early_stopping.step(test_mse, model, epoch):
+            break
+
+    if early_stopping:
+        early_stopping.restore_best(model)
+
     return results
 
 
+def get_amp_dtype(device) -> torch.dtype:
+    """
+    Autocast dtype for mixed precision training: bfloat16 on CPU and on CUDA devices supporting
+    it, float16 otherwise.
+    """
+    if torch.device(device).type == "cuda" and not torch.cuda.is_bf16_supported():
+        return torch.float16
+    return torch.bfloat16
+
+
+def get_epoch_metrics(
+    total_loss: torch.Tensor, total_mae: torch.Tensor, total_samples: int
+) -> tuple[float, float, float]:
+    """
+    Compute the MSE, MAE and RMSE of an epoch from the summed batch losses and absolute errors.
+    The sums are accumulated on the device, so they are read back only once per epoch instead
+    of synchronizing with the device after every batch.
+    """
+    mse = total_loss.item() / total_samples
+    mae = total_mae.item() / total_samples
+    rmse = math.sqrt(mse)
+    return mse, mae, rmse
+
+
 def train_step(
     model: torch.nn.Module,
     train_dataloader: torch.utils.data.DataLoader,
     optimizer: torch.optim.Optimizer,
     loss_fn: torch.nn.Module,
     device="cuda",
+    amp_dtype: Optional[torch.dtype] = None,
+    scaler: Optional[torch.amp.GradScaler] = None,
 ) -> tuple[float, float, float]:
+    device_type = torch.device(device).type
+    if scaler is None:
+        scaler = torch.amp.GradScaler(device_type, enabled=False)
     model.train()
-    total_loss = 0
-    total_mae = 0.0
+    total_loss = torch.zeros((), device=device)
+    total_mae = torch.zeros((), device=device)
     total_samples = 0
     for batch, (inputs, targets) in enumerate(train_dataloader):
         inputs, targets = inputs.to(device), targets.to(device)
         optimizer.zero_grad()
-        outputs = model(inputs)
-        loss = loss_fn(outputs, targets)
-        loss.backward()
-        optimizer.step()
-        total_loss += loss.item()
-        total_mae += torch.abs(outputs - targets).sum().item()
+        with torch.autocast(device_type, dtype=amp_dtype, enabled=amp_dtype is not None):
+            outputs = model(inputs)
+            loss = loss_fn(outputs, targets)
+        scaler.scale(loss).backward()
+        scaler.step(optimizer)
+        scaler.update()
+        total_loss += loss.detach()
+        total_mae += torch.abs(outputs.detach() - targets).sum()
         total_samples += targets.size(0) * targets.size(2)
-    mse = total_loss / total_samples
-    mae = total_mae / total_samples
-    rmse = math.sqrt(mse)
-    return mse, mae, rmse
+    return get_epoch_metrics(total_loss, total_mae, total_samples)
 
 
 def test_step(
@@ -83,20 +145,20 @@ def test_step(
     test_dataloader: torch.utils.data.DataLoader,
     loss_fn: torch.nn.Module,
     device="cuda",
+    amp_dtype: Optional[torch.dtype] = None,
 ) -> tuple[float, float, float]:
+    device_type = torch.device(device).type
     model.eval()
-    total_loss = 0
-    total_mae = 0.0
+    total_loss = torch.zeros((), device=device)
+    total_mae = torch.zeros((), device=device)
     total_samples = 0
     with torch.inference_mode():
         for batch, (inputs, targets) in enumerate(test_dataloader):
             inputs, targets = inputs.to(device), targets.to(device)
-            outputs = model(inputs)
-            loss = loss_fn(outputs, targets)
-            total_loss += loss.item()
-            total_mae += torch.abs(outputs - targets).sum().item()
+            with torch.autocast(device_type, dtype=amp_dtype, enabled=amp_dtype is not None):
+                outputs = model(inputs)
+                loss = loss_fn(outputs, targets)
+            total_loss += loss
+            total_mae += torch.abs(outputs - targets).sum()
             total_samples += targets.size(0) * targets.size(2)
-    mse = total_loss / total_samples
-    mae = total_mae / total_samples
-    rmse = math.sqrt(mse)
-    return mse, mae, rmse
+    return get_epoch_metrics(total_loss, total_mae, total_samples)
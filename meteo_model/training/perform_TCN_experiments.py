@@ -2,13 +2,17 @@ import os
 import torch
 import optuna
 import argparse
+from pathlib import Path
 from meteo_model.training.engine import train
+from meteo_model.data.config import MMAP_DIR
 from meteo_model.data.data_loader import create_dataloaders
 from meteo_model.model.weather_model_tcn import WeatherModelTCN
+from meteo_model.training.config import DEFAULT_PRUNER, EARLY_STOPPING_PATIENCE
 from meteo_model.training.config import OPTUNA_STORAGE_PATH_TCN
+from meteo_model.training.pruning import PRUNERS, create_pruner, get_pruning_callback
 
 
-def objective_tcn(trial, experiment_name, n_days):
+def objective_tcn(trial, experiment_name, n_days, mmap_dir=None):
     batch_size = trial.suggest_int("batch_size", 4, 32, step=2)
     lr = trial.suggest_float("lr", 1e-5, 1e-1, log=True)
     epochs = trial.suggest_int("epochs", 5, 20)
@@ -37,6 +41,7 @@ def objective_tcn(trial, experiment_name, n_days):
         split_ratio=split_ratio,
         batch_size=batch_size,
         num_workers=os.cpu_count(),
+        mmap_dir=mmap_dir,
     )
 
     loss_fn = torch.nn.MSELoss()
@@ -61,19 +66,22 @@ def objective_tcn(trial, experiment_name, n_days):
         device=device,
         enable_logging=True,
         experiment_name=experiment_name,
+        early_stopping_patience=EARLY_STOPPING_PATIENCE,
+        epoch_callback=get_pruning_callback(trial),
     )
 
-    return results["Test_MSE"][-1]
+    return min(results["Test_MSE"])
 
 
-def create_study_for_(objective, name, n_days):
+def create_study_for_(objective, name, n_days, pruner=DEFAULT_PRUNER, mmap_dir=None):
     study = optuna.create_study(
         study_name=name,
         direction="minimize",
+        pruner=create_pruner(pruner),
         storage=OPTUNA_STORAGE_PATH_TCN,
         load_if_exists=True,
     )
-    study.optimize(lambda trial: objective(trial, name, n_days), n_trials=60)
+    study.optimize(lambda trial: objective(trial, name, n_days, mmap_dir), n_trials=60)
 
     print("Best trial:")
     print(f"  Value: {study.best_trial.value}")
@@ -84,9 +92,22 @@ def main():
     parser = argparse.ArgumentParser(description="Perform TCN experiments")
     parser.add_argument("--n_days", type=int, help="Number of days for prediction")
     parser.add_argument("--experiment_name", type=str, help="Name of the experiment")
+    parser.add_argument(
+        "--pruner",
+        type=str,
+        choices=list(PRUNERS),
+        default=DEFAULT_PRUNER,
+        help="Optuna pruner stopping unpromising trials",
+    )
+    parser.add_argument(
+        "--mmap_dir",
+        type=Path,
+        default=Path(MMAP_DIR),
+        help="Directory of the memory-mapped dataset shared by the DataLoader workers",
+    )
     args = parser.parse_args()
 
-    create_study_for_(objective_tcn, args.experiment_name, args.n_days)
+    create_study_for_(objective_tcn, args.experiment_name, args.n_days, args.pruner, args.mmap_dir)
 
 
 if __name__ == "__main__":
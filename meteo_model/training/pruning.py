@@ -0,0 +1,33 @@
+"""Optuna pruning of unpromising trials during training"""
+
+from typing import Callable
+
+import optuna
+
+PRUNERS: dict[str, Callable[[], optuna.pruners.BasePruner]] = {
+    "median": lambda: optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=2),
+    "hyperband": lambda: optuna.pruners.HyperbandPruner(min_resource=2),
+    "none": optuna.pruners.NopPruner,
+}
+
+
+def create_pruner(name: str) -> optuna.pruners.BasePruner:
+    if name not in PRUNERS:
+        raise ValueError(f"Unknown pruner {name}, expected one of {list(PRUNERS)}.")
+    return PRUNERS[name]()
+
+
+def get_pruning_callback(
+    trial: optuna.Trial, metric: str = "Test_MSE"
+) -> Callable[[int, dict[str, float]], None]:
+    """
+    Epoch callback for engine.train reporting the metric of every epoch to the trial.
+    Raises optuna.TrialPruned when the pruner of the study decides to stop the trial.
+    """
+
+    def callback(epoch: int, metrics: dict[str, float]) -> None:
+        trial.report(metrics[metric], epoch)
+        if trial.should_prune():
+            raise optuna.TrialPruned(f"Trial pruned at epoch {epoch}.")
+
+    return callback
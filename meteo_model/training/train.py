@@ -1,7 +1,7 @@
 from meteo_model.data.data_loader import create_dataloaders
 from meteo_model.training.engine import train
-from meteo_model.model.weather_model_lstm import WeatherModelLSTM
-from meteo_model.model.weather_model_tcn import WeatherModelTCN
+from meteo_model.model.weather_model_lstm import GroupedWeatherModelLSTM, WeatherModelLSTM
+from meteo_model.model.weather_model_tcn import GroupedWeatherModelTCN, WeatherModelTCN
 from meteo_model.utils.training_utils import parse_arguments
 import torch
 from pathlib import Path
@@ -21,10 +21,13 @@ def main():
         split_ratio=0.8,
         batch_size=args.batch_size,
         num_workers=num_workers,
+        mmap_dir=args.mmap_dir,
+        device=device if args.device_loader else None,
     )
 
     if args.model_type == "lstm":
-        model = WeatherModelLSTM(
+        lstm_class = GroupedWeatherModelLSTM if args.grouped else WeatherModelLSTM
+        model = lstm_class(
             num_features=9,
             num_locations=args.n_locations,
             output_len=args.output_len,
@@ -40,6 +43,8 @@ def main():
             kernel_size=args.kernel_size,
             dropout=args.dropout,
         ).to(device)
+        if args.grouped:
+            model = GroupedWeatherModelTCN.from_per_location(model)
 
     optimizer = torch.optim.Adam(model.parameters(), lr=args.lr)
     loss_fn = torch.nn.MSELoss()
@@ -54,6 +59,9 @@ def main():
         device=device,
         enable_logging=args.enable_logging,
         experiment_name=args.experiment_name,
+        amp=args.amp,
+        early_stopping_patience=args.early_stopping_patience,
+        early_stopping_min_delta=args.early_stopping_min_delta,
     )
 
 
@@ -1,6 +1,8 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+import time
+import torch
 
 
 def visualize_predictions(
@@ -32,3 +34,70 @@ def visualize_predictions(
 
     plt.tight_layout()
     plt.show()
+
+
+def collect_predictions(
+    model: torch.nn.Module, dataloader: torch.utils.data.DataLoader, device: torch.device
+) -> tuple[torch.Tensor, torch.Tensor, float]:
+    """
+    Predict the whole dataloader with the model.
+    Returns the predictions, the targets and the mean inference time of a batch in ms.
+    """
+    model.eval()
+    predictions = []
+    targets = []
+    inference_time = 0.0
+    with torch.inference_mode():
+        for inputs, batch_targets in dataloader:
+            inputs = inputs.to(device)
+            start = time.perf_counter()
+            outputs = model(inputs)
+            if outputs.is_cuda:
+                torch.cuda.synchronize(outputs.device)
+            inference_time += time.perf_counter() - start
+            predictions.append(outputs.cpu())
+            targets.append(batch_targets.cpu())
+    return torch.cat(predictions), torch.cat(targets), 1000 * inference_time / len(predictions)
+
+
+def compute_errors(predictions: torch.Tensor, targets: torch.Tensor) -> dict[str, float]:
+    errors = predictions - targets
+    mse = errors.square().mean().item()
+    return {"MSE": mse, "MAE": errors.abs().mean().item(), "RMSE": mse**0.5}
+
+
+def compute_horizon_errors(
+    predictions: torch.Tensor, targets: torch.Tensor, max_days: int
+) -> pd.DataFrame:
+    """
+    Errors of the forecasts for 1 to max_days days, i.e. over the first n_days predicted steps
+    of (B, 1, O, F) predictions.
+    """
+    rows = {
+        n_days: compute_errors(predictions[:, :, :n_days], targets[:, :, :n_days])
+        for n_days in range(1, max_days + 1)
+    }
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis("n_days")
+
+
+def compare_models(
+    models: dict[str, torch.nn.Module],
+    dataloader: torch.utils.data.DataLoader,
+    device: torch.device,
+) -> pd.DataFrame:
+    """
+    Compare the errors and the batch latency of model variants on the dataloader.
+    The first model is the reference for the maximum absolute prediction difference.
+    """
+    rows = {}
+    reference = None
+    for name, model in models.items():
+        predictions, targets, latency = collect_predictions(model, dataloader, device)
+        if reference is None:
+            reference = predictions
+        rows[name] = {
+            **compute_errors(predictions, targets),
+            "Latency [ms/batch]": latency,
+            "Max diff": (predictions - reference).abs().max().item(),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -1,4 +1,5 @@
 import re
+import hashlib
 import pandas as pd
 from pathlib import Path
 import logging
@@ -35,6 +36,21 @@ def save_data_to_csv(data: pd.DataFrame, path: Path):
     data.to_csv(path, index=False)
 
 
+def get_file_signature(path: Path) -> list[int]:
+    """Get the modification time and size of a file, used to detect changes to it."""
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def get_file_hash(path: Path) -> str:
+    """Get the SHA-256 hash of the content of a file."""
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
 def get_station_name_from_city_name(city_name: str) -> str:
     """Get the station name from the city name."""
     staions = {
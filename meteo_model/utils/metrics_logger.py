@@ -0,0 +1,78 @@
+"""Background logging of the per-epoch training metrics to MLflow"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Optional
+
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
+
+EpochMetrics = dict[str, float]
+
+
+class AsyncMetricsLogger:
+    def __init__(self, run_id: str, client: Optional[Any] = None):
+        """
+        Logs the metrics of every epoch with a single log_batch call from a background thread,
+        so the tracking store is never waited on by the training loop.
+        Use as a context manager, leaving it waits until all queued metrics are logged.
+        Failed log_batch calls do not interrupt training, their steps are counted and reported
+        with a warning on close.
+
+        Args:
+            run_id (str): ID of the MLflow run the metrics belong to.
+            client (MlflowClient): Client used for logging, created for the current tracking URI
+                by default.
+        """
+        self.run_id = run_id
+        self.client = client or MlflowClient()
+        self._queue: queue.Queue[Optional[tuple[int, EpochMetrics, int]]] = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self.failed_steps: list[int] = []
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            step, metrics, timestamp = item
+            try:
+                self.client.log_batch(
+                    self.run_id,
+                    metrics=[
+                        Metric(key, value, timestamp, step) for key, value in metrics.items()
+                    ],
+                )
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+                self.failed_steps.append(step)
+
+    def log(self, step: int, metrics: EpochMetrics) -> None:
+        """
+        Queue the metrics of a step for logging.
+        """
+        self._queue.put((step, dict(metrics), int(time.time() * 1000)))
+
+    def close(self) -> None:
+        """
+        Wait until all queued metrics are logged. Logs a warning with the number of steps
+        whose metrics could not be logged and the first error, if any.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self.failed_steps:
+            logging.warning(
+                f"Metrics of {len(self.failed_steps)} steps were not logged to MLflow "
+                f"(steps {self.failed_steps}), first error: {self._error!r}"
+            )
+
+    def __enter__(self) -> "AsyncMetricsLogger":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
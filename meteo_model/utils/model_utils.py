@@ -1,6 +1,134 @@
+import copy
+import logging
 import mlflow.pytorch
+import tempfile
+import torch
+from torch import nn
+from torch.ao.quantization import quantize_dynamic
+from mlflow import MlflowClient
+from mlflow.exceptions import MlflowException
+from pathlib import Path
+from typing import Optional, Union
+from meteo_model.data.config import NORM_COLUMNS
 from meteo_model.model.base_model import BaseWeatherModel
+from meteo_model.model.weather_model_lstm import GroupedWeatherModelLSTM
 
+TORCHSCRIPT_ARTIFACT_PATH = "torchscript"
+TORCHSCRIPT_FILE_NAME = "model.pt"
 
-def load_model(model_name: str, model_version: int, map_location: str) -> BaseWeatherModel:
+MapLocation = Union[str, torch.device]
+
+
+def load_model(model_name: str, model_version: int, map_location: MapLocation) -> BaseWeatherModel:
     return mlflow.pytorch.load_model(model_uri=f"models:/{model_name}/{model_version}", map_location=map_location)
+
+
+def get_latest_model_version(model_name: str) -> int:
+    versions = MlflowClient().search_model_versions(f"name='{model_name}'")
+    return max(int(model_version.version) for model_version in versions)
+
+
+def export_torchscript(
+    model: torch.nn.Module, example_input: torch.Tensor
+) -> torch.jit.ScriptModule:
+    """
+    Trace the model on a (B, N, L, F) example input into a frozen TorchScript module.
+    The autoregressive loop is unrolled for the model's output_len, the batch size stays dynamic.
+    """
+    was_training = model.training
+    model.eval()
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example_input)
+    model.train(was_training)
+    return torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+
+
+def log_torchscript_model(model: torch.nn.Module, example_input: torch.Tensor) -> bool:
+    """
+    Log the TorchScript export of a CPU copy of the model to the active MLflow run, so the
+    export does not depend on the training device. A failed export is logged as a warning,
+    load_serving_model then falls back to the eager model.
+    Returns True if the export was logged.
+    """
+    try:
+        cpu_model = copy.deepcopy(model).cpu()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / TORCHSCRIPT_FILE_NAME
+            torch.jit.save(export_torchscript(cpu_model, example_input.cpu()), str(path))
+            mlflow.log_artifact(str(path), TORCHSCRIPT_ARTIFACT_PATH)
+    except Exception as e:
+        logging.warning(f"TorchScript export failed, only the eager model is logged: {e!r}")
+        return False
+    return True
+
+
+def load_torchscript_model(
+    model_name: str, model_version: int, map_location: MapLocation
+) -> Optional[torch.jit.ScriptModule]:
+    """
+    Load the TorchScript export logged in the run of the registered model version.
+    Returns None if the run has no export.
+    """
+    run_id = MlflowClient().get_model_version(model_name, str(model_version)).run_id
+    try:
+        path = mlflow.artifacts.download_artifacts(
+            run_id=run_id, artifact_path=f"{TORCHSCRIPT_ARTIFACT_PATH}/{TORCHSCRIPT_FILE_NAME}"
+        )
+    except (MlflowException, OSError):
+        return None
+    return torch.jit.load(path, map_location=map_location)
+
+
+def load_serving_model(
+    model_name: str,
+    model_version: int,
+    map_location: MapLocation,
+    stateful_decoding: bool = False,
+    streaming_decoding: bool = False,
+) -> Union[torch.jit.ScriptModule, BaseWeatherModel]:
+    """
+    Load the TorchScript export of the registered model version if available,
+    the pickled model otherwise.
+    The export is traced with the default decoding, so the pickled model is loaded when
+    stateful_decoding or streaming_decoding is requested.
+    """
+    if stateful_decoding or streaming_decoding:
+        logging.warning(
+            f"Loading the eager model of {model_name} {model_version}, TorchScript exports "
+            "do not support stateful or streaming decoding."
+        )
+        return load_model(model_name, model_version, map_location)
+
+    model: Union[torch.jit.ScriptModule, BaseWeatherModel, None] = load_torchscript_model(
+        model_name, model_version, map_location
+    )
+    if model is None:
+        model = load_model(model_name, model_version, map_location)
+    return model
+
+
+def get_output_len(
+    model: torch.nn.Module, num_locations: int, input_len: int, device: MapLocation = "cpu"
+) -> int:
+    """
+    Number of days predicted by the model, found with a forward pass on a zero input, as
+    TorchScript exports do not keep the output_len attribute.
+    """
+    x = torch.zeros(1, num_locations, input_len, len(NORM_COLUMNS), device=device)
+    with torch.inference_mode():
+        return model(x).shape[2]
+
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Return a copy of the model with dynamic int8 quantization of its LSTM and Linear layers,
+    for CPU inference. Convolutions have no dynamic quantization, so only the final Linear
+    layer of TCN models is quantized.
+    """
+    if isinstance(model, GroupedWeatherModelLSTM):
+        raise ValueError(
+            "GroupedWeatherModelLSTM uses the LSTM weights directly, quantize the "
+            "per-location WeatherModelLSTM instead."
+        )
+    quantized = copy.deepcopy(model).cpu().eval()
+    return quantize_dynamic(quantized, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
@@ -2,9 +2,13 @@ import mlflow
 from mlflow.models.signature import infer_signature
 from functools import wraps
 import argparse
+from pathlib import Path
+import torch
 from meteo_model.model.weather_model_lstm import WeatherModelLSTM
-from meteo_model.model.weather_model_tcn import WeatherModelTCN
-from meteo_model.data.config import LOCATIONS_NAMES
+from meteo_model.model.weather_model_tcn import BaseWeatherModelTCN
+from meteo_model.data.config import LOCATIONS_NAMES, MMAP_DIR
+from meteo_model.utils.metrics_logger import AsyncMetricsLogger
+from meteo_model.utils.model_utils import log_torchscript_model
 
 
 def mlflow_logging(func):
@@ -15,7 +19,7 @@ def mlflow_logging(func):
         if not enable_logging:
             return func(*args, **kwargs)
 
-        model = kwargs.get("model")
+        model = kwargs["model"]
         train_dataloader = kwargs.get("train_dataloader")
         optimizer = kwargs.get("optimizer")
         epochs = kwargs.get("epochs")
@@ -28,31 +32,40 @@ def mlflow_logging(func):
             mlflow.log_param("Input Length", train_dataloader.dataset.dataset.input_len)
             mlflow.log_param("Epochs", epochs)
             mlflow.log_param("Locations_size", len(train_dataloader.dataset.dataset.location))
+            mlflow.log_param("AMP", kwargs.get("amp", False))
 
             if isinstance(model, WeatherModelLSTM):
                 mlflow.log_param("Hidden Size", model.hidden_size)
                 mlflow.log_param("Number of Layers", model.num_layers)
                 mlflow.log_param("Model Type", "LSTM")
-            if isinstance(model, WeatherModelTCN):
+            if isinstance(model, BaseWeatherModelTCN):
                 mlflow.log_param("Kernel Size", model.kernel_size)
                 mlflow.log_param("Dropout", model.dropout)
                 mlflow.log_param("Number of Channels", model.num_channels)
                 mlflow.log_param("Model Type", "TCN")
 
-            results = func(*args, **kwargs)
+            if kwargs.get("early_stopping_patience") is not None:
+                mlflow.log_param("Early Stopping Patience", kwargs["early_stopping_patience"])
+                mlflow.log_param(
+                    "Early Stopping Min Delta", kwargs.get("early_stopping_min_delta", 0.0)
+                )
 
-            for epoch in range(epochs):
-                mlflow.log_metric("Train_MSE", results["Train_MSE"][epoch], step=epoch)
-                mlflow.log_metric("Test_MSE", results["Test_MSE"][epoch], step=epoch)
-                mlflow.log_metric("Train_MAE", results["Train_MAE"][epoch], step=epoch)
-                mlflow.log_metric("Test_MAE", results["Test_MAE"][epoch], step=epoch)
-                mlflow.log_metric("Train_RMSE", results["Train_RMSE"][epoch], step=epoch)
-                mlflow.log_metric("Test_RMSE", results["Test_RMSE"][epoch], step=epoch)
+            epoch_callback = kwargs.pop("epoch_callback", None)
+            with AsyncMetricsLogger(run.info.run_id) as metrics_logger:
+
+                def log_epoch(epoch: int, metrics: dict[str, float]) -> None:
+                    metrics_logger.log(epoch, metrics)
+                    if epoch_callback:
+                        epoch_callback(epoch, metrics)
+
+                results = func(*args, epoch_callback=log_epoch, **kwargs)
+            mlflow.log_metric("Epochs Run", len(results["Test_MSE"]))
 
             sample_input = train_dataloader.dataset[0][0].numpy()
             sample_output = model(train_dataloader.dataset[0][0].to(device)).detach().cpu().numpy()
             signature = infer_signature(sample_input, sample_output)
             mlflow.pytorch.log_model(model, "models", signature=signature)
+            log_torchscript_model(model, torch.from_numpy(sample_input).unsqueeze(0))
 
         return results
 
@@ -91,6 +104,12 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument(
         "--num_layers", type=int, default=2, help="Number of layers for the LSTM model"
     )
+    parser.add_argument(
+        "--grouped",
+        type=str2bool,
+        default=False,
+        help="Process all locations at once (one fused LSTM on CUDA or grouped TCN convolutions)",
+    )
     parser.add_argument("--kernel_size", type=int, default=2, help="Kernel size of TCN")
     parser.add_argument("--dropout", type=int, default=0.1, help="Dropout for TCN")
     parser.add_argument(
@@ -101,6 +120,40 @@ def parse_arguments() -> argparse.Namespace:
         default=[9, 2, 1, 2, 9],
     )
 
+    parser.add_argument(
+        "--device_loader",
+        type=str2bool,
+        default=False,
+        help="Keep the whole dataset on the training device and skip the DataLoader",
+    )
+
+    parser.add_argument(
+        "--mmap_dir",
+        type=Path,
+        default=Path(MMAP_DIR),
+        help="Directory of the memory-mapped dataset shared by the DataLoader workers",
+    )
+
+    parser.add_argument(
+        "--amp",
+        type=str2bool,
+        default=False,
+        help="Train with automatic mixed precision (bfloat16 on CPU, float16/bfloat16 on CUDA)",
+    )
+
+    parser.add_argument(
+        "--early_stopping_patience",
+        type=int,
+        default=None,
+        help="Stop after this many epochs without Test_MSE improvement and keep the best weights",
+    )
+    parser.add_argument(
+        "--early_stopping_min_delta",
+        type=float,
+        default=0.0,
+        help="Minimal Test_MSE decrease counted as an improvement for early stopping",
+    )
+
     parser.add_argument("--lr", type=float, default=0.001, help="Learning rate for the optimizer")
     parser.add_argument("--epochs", type=int, default=5, help="Number of epochs for training")
     parser.add_argument(
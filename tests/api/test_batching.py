@@ -0,0 +1,110 @@
+import threading
+import time
+import pytest
+import torch
+from concurrent.futures import ThreadPoolExecutor
+from api.batching import MicroBatcher
+
+
+class RecordingModel:
+    def __init__(self):
+        self.batches: list[tuple[str, torch.Tensor]] = []
+        self.lock = threading.Lock()
+        self.busy = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, key: str, batch: torch.Tensor) -> torch.Tensor:
+        if key == "busy":
+            self.busy.set()
+            self.release.wait()
+            return batch
+        with self.lock:
+            self.batches.append((key, batch))
+        return 2 * batch
+
+
+def submit_all(batcher: MicroBatcher, requests: list[tuple[str, torch.Tensor]]):
+    """
+    Submit the requests concurrently while another request is in flight, so they are batched.
+    """
+    model = batcher.predict_fn
+    with ThreadPoolExecutor(max_workers=len(requests) + 1) as executor:
+        busy = executor.submit(batcher.submit, "busy", torch.zeros(1))
+        model.busy.wait()
+        results = list(executor.map(lambda request: batcher.submit(*request), requests))
+        model.release.set()
+        busy.result()
+    return results
+
+
+def test_identical_requests_are_deduplicated():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_wait=0.2)
+    x = torch.randn(5, 7, 9)
+
+    results = submit_all(batcher, [("model", x.clone()) for _ in range(8)])
+
+    assert len(model.batches) == 1
+    assert model.batches[0][1].shape == (1, 5, 7, 9)
+    for result in results:
+        torch.testing.assert_close(result, 2 * x)
+
+
+def test_requests_are_merged_per_key():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_wait=0.2)
+    inputs = [torch.full((2, 3), float(i)) for i in range(4)]
+    requests = [("a", inputs[0]), ("a", inputs[1]), ("b", inputs[2]), ("a", inputs[1])]
+
+    results = submit_all(batcher, requests)
+
+    assert sorted((key, len(batch)) for key, batch in model.batches) == [("a", 2), ("b", 1)]
+    for (_, x), result in zip(requests, results):
+        torch.testing.assert_close(result, 2 * x)
+
+
+def test_full_batch_does_not_wait():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_wait=60, max_batch_size=2)
+
+    results = submit_all(batcher, [("model", torch.zeros(1)), ("model", torch.ones(1))])
+
+    assert len(model.batches) == 1
+    assert [result.item() for result in results] == [0.0, 2.0]
+
+
+def test_request_without_others_in_flight_does_not_wait():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_wait=60)
+
+    start = time.perf_counter()
+    result = batcher.submit("model", torch.ones(1))
+
+    assert time.perf_counter() - start < 1
+    assert result.item() == 2.0
+
+
+def test_inputs_with_same_bytes_and_different_dtype_are_not_merged():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_wait=0.2)
+    requests = [
+        ("model", torch.zeros(4, dtype=torch.float32)),
+        ("model", torch.zeros(4, dtype=torch.int32)),
+    ]
+
+    results = submit_all(batcher, requests)
+
+    assert len(model.batches[0][1]) == 2
+    assert [result.dtype for result in results] == [torch.float32, torch.float32]
+
+
+def test_errors_are_raised_for_every_request():
+    def failing_model(key, batch):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(failing_model, max_wait=0.1)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(batcher.submit, "model", torch.zeros(1)) for _ in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model failed"):
+                future.result()
@@ -0,0 +1,100 @@
+import threading
+import time
+import pytest
+import torch
+from concurrent.futures import ThreadPoolExecutor
+from api.model_cache import ModelCache
+
+
+class FakeRegistry:
+    def __init__(self):
+        self.latest_versions = {"a": 1, "b": 1, "c": 1}
+        self.loads: list[tuple[str, int]] = []
+        self.version_checks = 0
+        self.lock = threading.Lock()
+
+    def load(self, name: str, version: int) -> torch.nn.Module:
+        with self.lock:
+            self.loads.append((name, version))
+        time.sleep(0.05)
+        return torch.nn.Linear(1, 1)
+
+    def latest_version(self, name: str) -> int:
+        self.version_checks += 1
+        return self.latest_versions[name]
+
+
+def test_models_are_loaded_once():
+    registry = FakeRegistry()
+    cache = ModelCache(registry.load, registry.latest_version)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: cache.get("a", 1), range(8)))
+
+    assert registry.loads == [("a", 1)]
+    assert all(model is models[0] for model in models)
+
+
+def test_least_recently_used_model_is_evicted():
+    registry = FakeRegistry()
+    cache = ModelCache(registry.load, registry.latest_version, max_size=2)
+
+    cache.preload([("a", 1), ("b", 1)])
+    cache.get("a", 1)
+    cache.get("c", 1)
+    cache.get("a", 1)
+    cache.get("b", 1)
+
+    assert registry.loads == [("a", 1), ("b", 1), ("c", 1), ("b", 1)]
+
+
+def test_latest_version_is_reloaded_after_interval(fake_clock):
+    registry = FakeRegistry()
+    cache = ModelCache(
+        registry.load, registry.latest_version, reload_interval=60, clock=fake_clock
+    )
+
+    first = cache.get("a")
+    registry.latest_versions["a"] = 2
+    fake_clock.now += 30
+    assert cache.get("a") is first
+    assert registry.version_checks == 1
+
+    fake_clock.now += 31
+    second = cache.get("a")
+    assert second is not first
+    assert registry.loads == [("a", 1), ("a", 2)]
+    assert cache.get("a") is second
+
+
+def test_cached_version_is_served_when_version_check_fails(fake_clock):
+    registry = FakeRegistry()
+    cache = ModelCache(
+        registry.load, registry.latest_version, reload_interval=60, clock=fake_clock
+    )
+    first = cache.get("a")
+
+    def failing_latest_version(name):
+        registry.version_checks += 1
+        raise ConnectionError("registry unavailable")
+
+    cache.latest_version_fn = failing_latest_version
+    fake_clock.now += 61
+    assert cache.get("a") is first
+    assert cache.get("a") is first
+    assert registry.version_checks == 2
+
+    cache.latest_version_fn = registry.latest_version
+    registry.latest_versions["a"] = 2
+    fake_clock.now += 61
+    assert cache.get("a") is not first
+    assert registry.loads == [("a", 1), ("a", 2)]
+
+
+def test_failed_version_check_without_cached_version_is_raised():
+    def failing_latest_version(name):
+        raise ConnectionError("registry unavailable")
+
+    cache = ModelCache(FakeRegistry().load, failing_latest_version)
+    with pytest.raises(ConnectionError):
+        cache.get("a")
@@ -0,0 +1,118 @@
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from meteo_model.data.data_cache import (
+    get_cache_path,
+    load_stage_cache,
+    read_weather_csv,
+    update_stage_cache,
+    write_stage_cache,
+)
+
+
+@pytest.fixture
+def stage_dir(tmp_path):
+    for year in (2012, 2013):
+        year_dir = tmp_path / str(year)
+        year_dir.mkdir()
+        for station in ("WARSAW", "KRAKOW"):
+            pd.DataFrame({
+                "tavg": [1.5, np.nan, 3.0],
+                "wdir": [90, 180, 270],
+                "station": [station, np.nan, station],
+            }).to_csv(year_dir / f"{station}_weather_data.csv", index=False)
+    return tmp_path
+
+
+def test_write_stage_cache_creates_file(stage_dir):
+    assert write_stage_cache(stage_dir) == get_cache_path(stage_dir)
+    assert get_cache_path(stage_dir).exists()
+
+
+def test_write_stage_cache_empty_dir(tmp_path):
+    assert write_stage_cache(tmp_path) is None
+    assert load_stage_cache(tmp_path) is None
+
+
+def test_read_weather_csv_from_cache_matches_csv(stage_dir):
+    write_stage_cache(stage_dir)
+    cache = load_stage_cache(stage_dir)
+    for csv_path in stage_dir.glob("*/*.csv"):
+        cached_df = cache.get(csv_path)
+        assert cached_df is not None
+        pd.testing.assert_frame_equal(cached_df, pd.read_csv(csv_path))
+        pd.testing.assert_frame_equal(read_weather_csv(csv_path), pd.read_csv(csv_path))
+
+
+def test_modified_file_is_read_from_csv(stage_dir):
+    write_stage_cache(stage_dir)
+    csv_path = stage_dir / "2012" / "WARSAW_weather_data.csv"
+    pd.DataFrame({"tavg": [7.0], "wdir": [10], "station": ["WARSAW"]}).to_csv(
+        csv_path, index=False
+    )
+    os.utime(csv_path, ns=(0, 0))
+
+    assert load_stage_cache(stage_dir).get(csv_path) is None
+    assert read_weather_csv(csv_path)["tavg"].tolist() == [7.0]
+
+
+def test_rewritten_cache_is_reloaded(stage_dir):
+    write_stage_cache(stage_dir)
+    first_cache = load_stage_cache(stage_dir)
+    assert load_stage_cache(stage_dir) is first_cache
+
+    write_stage_cache(stage_dir)
+    assert load_stage_cache(stage_dir) is not first_cache
+
+
+def test_cache_is_read_by_relative_and_absolute_path(stage_dir, monkeypatch):
+    monkeypatch.chdir(stage_dir.parent)
+    relative_dir = stage_dir.relative_to(stage_dir.parent)
+    write_stage_cache(relative_dir)
+    expected = pd.read_csv(stage_dir / "2012" / "WARSAW_weather_data.csv")
+
+    file_name = "WARSAW_weather_data.csv"
+    for csv_path in (relative_dir / "2012" / file_name, stage_dir / "2012" / file_name):
+        assert load_stage_cache(csv_path.parent.parent).get(csv_path) is not None
+        pd.testing.assert_frame_equal(read_weather_csv(csv_path), expected)
+
+
+def test_update_stage_cache_skips_unchanged_stage(stage_dir):
+    assert update_stage_cache(stage_dir) == get_cache_path(stage_dir)
+    assert update_stage_cache(stage_dir) is None
+
+    csv_path = stage_dir / "2013" / "KRAKOW_weather_data.csv"
+    pd.DataFrame({"tavg": [7.0], "wdir": [10], "station": ["KRAKOW"]}).to_csv(
+        csv_path, index=False
+    )
+    os.utime(csv_path, ns=(0, 0))
+    assert update_stage_cache(stage_dir) == get_cache_path(stage_dir)
+    assert read_weather_csv(csv_path)["tavg"].tolist() == [7.0]
+
+    (stage_dir / "2013" / "WARSAW_weather_data.csv").unlink()
+    assert update_stage_cache(stage_dir) == get_cache_path(stage_dir)
+
+
+def test_update_stage_cache_parses_only_changed_files(stage_dir, monkeypatch):
+    update_stage_cache(stage_dir)
+    csv_path = stage_dir / "2013" / "KRAKOW_weather_data.csv"
+    pd.DataFrame({"tavg": [7.0], "wdir": [10], "station": ["KRAKOW"]}).to_csv(
+        csv_path, index=False
+    )
+    os.utime(csv_path, ns=(0, 0))
+
+    read_paths = []
+    read_csv = pd.read_csv
+
+    def recording_read_csv(path, *args, **kwargs):
+        read_paths.append(path)
+        return read_csv(path, *args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", recording_read_csv)
+    assert update_stage_cache(stage_dir) == get_cache_path(stage_dir)
+    monkeypatch.undo()
+
+    assert read_paths == [csv_path]
+    for path in stage_dir.glob("*/*_weather_data.csv"):
+        pd.testing.assert_frame_equal(read_weather_csv(path), pd.read_csv(path))
@@ -142,3 +142,71 @@ def test_great_expectations(sample_data):
     dataset.expect_column_to_exist("tavg")
     dataset.expect_column_values_to_not_be_null("tavg")
     dataset.expect_column_median_to_be_between("tavg", min_value=5, max_value=15)
+
+
+def fill_seasonal_reference(dataframes, median_by_day, start_offset):
+    for df in dataframes:
+        for day in range(min(366, len(df))):
+            for column in ["prcp", "wdir", "wspd", "pres"]:
+                if pd.isna(df.at[day, column]):
+                    df.at[day, column] = median_by_day.at[day + start_offset, column]
+
+
+@pytest.mark.parametrize("start_offset", [0, 17, 300])
+def test_seasonal_pattern_matches_cell_by_cell_fill(tmp_path, start_offset):
+    rng = np.random.default_rng(start_offset)
+    median_file = tmp_path / "median.csv"
+    median_by_day = pd.DataFrame(
+        rng.normal(size=(366, 4)), columns=["prcp", "wdir", "wspd", "pres"]
+    )
+    median_by_day.to_csv(median_file, index=False)
+    median_by_day = pd.read_csv(median_file)
+
+    def make_dataframes():
+        rng = np.random.default_rng(0)
+        dataframes = []
+        for n_days in (30, 65):
+            values = rng.normal(size=(n_days, 4))
+            values[rng.random(size=values.shape) < 0.3] = np.nan
+            dataframes.append(pd.DataFrame(values, columns=["prcp", "wdir", "wspd", "pres"]))
+        return dataframes
+
+    expected = make_dataframes()
+    fill_seasonal_reference(expected, median_by_day, start_offset)
+
+    cleaner = DataCleaner(make_dataframes())
+    cleaner.handle_NaN_based_on_sesonal_pattern(median_file, start_offset)
+    for df, expected_df in zip(cleaner.dataframes, expected):
+        pd.testing.assert_frame_equal(df, expected_df)
+
+
+def test_seasonal_pattern_wraps_around_end_of_year(mock_median_file):
+    df = pd.DataFrame({column: [np.nan] * 3 for column in ["prcp", "wdir", "wspd", "pres"]})
+    cleaner = DataCleaner([df])
+    cleaner.handle_NaN_based_on_sesonal_pattern(mock_median_file, start_offset=365)
+    assert df.notna().all().all()
+
+
+@pytest.mark.parametrize("days_in_year", [365, 366])
+def test_seasonal_pattern_wraps_to_first_day_of_next_year(tmp_path, days_in_year):
+    median_file = tmp_path / "median.csv"
+    pd.DataFrame({column: np.arange(366.0) for column in ["prcp", "wdir", "wspd", "pres"]}).to_csv(
+        median_file, index=False
+    )
+    df = pd.DataFrame({column: [np.nan] * 3 for column in ["prcp", "wdir", "wspd", "pres"]})
+    cleaner = DataCleaner([df])
+    cleaner.handle_NaN_based_on_sesonal_pattern(median_file, days_in_year - 1, days_in_year)
+    assert df["prcp"].tolist() == [days_in_year - 1, 0.0, 1.0]
+
+
+def test_calculate_median_by_day_matches_per_day_medians():
+    rng = np.random.default_rng(0)
+    dataframes = []
+    for n_days in (365, 366, 200):
+        values = rng.normal(size=(n_days, 5))
+        values[rng.random(size=values.shape) < 0.2] = np.nan
+        dataframes.append(pd.DataFrame(values, columns=["tavg", "prcp", "wdir", "wspd", "pres"]))
+    cleaner = DataCleaner(dataframes)
+
+    expected = calculate_median_by_day(cleaner).astype(float)
+    pd.testing.assert_frame_equal(cleaner.calculate_median_by_day(), expected)
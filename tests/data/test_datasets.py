@@ -0,0 +1,185 @@
+import pickle
+import pytest
+import numpy as np
+import pandas as pd
+import torch
+from meteo_model.data.datasets import MeteoDataset
+from meteo_model.data.data_loader import create_dataloaders
+from meteo_model.data.config import DATASET_START_YEAR, DATASET_END_YEAR, NORM_COLUMNS
+
+
+LOCATIONS = ["WARSAW", "KRAKOW"]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    for year in range(DATASET_START_YEAR, DATASET_END_YEAR + 1):
+        year_dir = tmp_path / str(year)
+        year_dir.mkdir()
+        n_days = 20 + year % 3
+        for loc in LOCATIONS:
+            pd.DataFrame(
+                rng.normal(size=(n_days, len(NORM_COLUMNS))), columns=NORM_COLUMNS
+            ).to_csv(year_dir / f"{loc}_weather_data.csv", index=False)
+    return tmp_path
+
+
+def make_dataset(data_dir, preload, input_len=7, output_len=3):
+    return MeteoDataset(
+        root_dir=data_dir,
+        location=LOCATIONS,
+        target_location="WARSAW",
+        input_len=input_len,
+        output_len=output_len,
+        preload=preload,
+    )
+
+
+def test_preloaded_array_shape(data_dir):
+    dataset = make_dataset(data_dir, preload=True)
+    total_days = sum(
+        dataset.data[year]["WARSAW"].shape[0]
+        for year in range(DATASET_START_YEAR, DATASET_END_YEAR + 1)
+    )
+    assert dataset.array.shape == (len(LOCATIONS), total_days, len(NORM_COLUMNS))
+    assert dataset.array.dtype == np.float32
+    assert dataset.array.flags["C_CONTIGUOUS"]
+
+
+@pytest.mark.parametrize("input_len,output_len", [(7, 3), (2, 1), (12, 8)])
+def test_preloaded_items_match_dataframe_items(data_dir, input_len, output_len):
+    preloaded = make_dataset(data_dir, True, input_len, output_len)
+    lazy = make_dataset(data_dir, False, input_len, output_len)
+    assert len(preloaded) == len(lazy)
+    for idx in range(len(lazy)):
+        X, y = preloaded[idx]
+        X_ref, y_ref = lazy[idx]
+        assert X.shape == (len(LOCATIONS), input_len, len(NORM_COLUMNS))
+        assert y.shape == (1, output_len, len(NORM_COLUMNS))
+        assert torch.equal(X, X_ref)
+        assert torch.equal(y, y_ref)
+
+
+def test_preloaded_item_out_of_range(data_dir):
+    dataset = make_dataset(data_dir, preload=True)
+    with pytest.raises(IndexError):
+        dataset[len(dataset)]
+
+
+def test_preload_requires_target_in_locations(data_dir):
+    with pytest.raises(ValueError):
+        MeteoDataset(root_dir=data_dir, location=["KRAKOW"], target_location="WARSAW")
+
+
+def test_get_day_matches_year_walk(data_dir):
+    dataset = make_dataset(data_dir, preload=False)
+    for idx in range(len(dataset)):
+        day = idx + dataset.input_len
+        year = dataset.start_year
+        while day >= dataset.data[year]["WARSAW"].shape[0]:
+            day -= dataset.data[year]["WARSAW"].shape[0]
+            year += 1
+        assert dataset._get_day(idx) == (year, day)
+
+
+def test_mmap_dataset_pickles_without_data(data_dir, tmp_path):
+    in_memory = make_dataset(data_dir, preload=True)
+    dataset = MeteoDataset(
+        root_dir=data_dir,
+        location=LOCATIONS,
+        input_len=7,
+        output_len=3,
+        mmap_dir=tmp_path / "mmap",
+    )
+    assert isinstance(dataset.array, np.memmap)
+    assert dataset.mmap_path.exists()
+
+    state = pickle.dumps(dataset)
+    assert len(state) < dataset.array.nbytes
+
+    unpickled = pickle.loads(state)
+    assert isinstance(unpickled.array, np.memmap)
+    assert unpickled.data is None
+    assert len(unpickled) == len(in_memory)
+    for idx in (0, len(in_memory) // 2, len(in_memory) - 1):
+        assert torch.equal(unpickled[idx][0], in_memory[idx][0])
+        assert torch.equal(unpickled[idx][1], in_memory[idx][1])
+
+
+def test_mmap_file_is_not_replaced_when_data_changes(data_dir, tmp_path):
+    def make_mmap_dataset():
+        return MeteoDataset(
+            root_dir=data_dir, location=LOCATIONS, mmap_dir=tmp_path / "mmap", input_len=7
+        )
+
+    first = make_mmap_dataset()
+    assert make_mmap_dataset().mmap_path == first.mmap_path
+
+    csv_path = data_dir / str(DATASET_END_YEAR) / "WARSAW_weather_data.csv"
+    df = pd.read_csv(csv_path)
+    df.iloc[0, 0] += 100.0
+    df.to_csv(csv_path, index=False)
+
+    second = make_mmap_dataset()
+    assert second.mmap_path != first.mmap_path
+    assert first.mmap_path.exists()
+    assert not np.array_equal(np.load(first.mmap_path), second.array)
+
+
+def test_mmap_dir_requires_preload(data_dir, tmp_path):
+    with pytest.raises(ValueError):
+        MeteoDataset(root_dir=data_dir, location=LOCATIONS, preload=False, mmap_dir=tmp_path)
+
+
+@pytest.mark.parametrize("preload", [True, False])
+def test_get_batch_matches_stacked_items(data_dir, preload):
+    dataset = make_dataset(data_dir, preload)
+    indices = [0, 5, 3, len(dataset) - 1]
+    X, y = dataset.get_batch(indices)
+    assert X.shape == (len(indices), len(LOCATIONS), dataset.input_len, len(NORM_COLUMNS))
+    assert y.shape == (len(indices), 1, dataset.output_len, len(NORM_COLUMNS))
+    assert torch.equal(X, torch.stack([dataset[idx][0] for idx in indices]))
+    assert torch.equal(y, torch.stack([dataset[idx][1] for idx in indices]))
+
+
+def test_dataloaders_return_batches(data_dir):
+    train_dl, test_dl = create_dataloaders(
+        root_dir=data_dir, location=LOCATIONS, input_len=7, output_len=3, batch_size=4
+    )
+    dataset = train_dl.dataset.dataset
+    X, y = next(iter(test_dl))
+    start = len(train_dl.dataset)
+    assert torch.equal(X, torch.stack([dataset[start + i][0] for i in range(4)]))
+    assert torch.equal(y, torch.stack([dataset[start + i][1] for i in range(4)]))
+    assert sum(X.size(0) for X, _ in train_dl) == len(train_dl.dataset)
+
+
+def test_device_loaders_match_dataloaders(data_dir):
+    kwargs = dict(root_dir=data_dir, location=LOCATIONS, input_len=7, output_len=3, batch_size=4)
+    train_dl, test_dl = create_dataloaders(**kwargs)
+    train_device_dl, test_device_dl = create_dataloaders(**kwargs, device="cpu")
+    assert len(train_device_dl) == len(train_dl)
+    assert len(test_device_dl) == len(test_dl)
+    for (X, y), (X_ref, y_ref) in zip(test_device_dl, test_dl):
+        assert torch.equal(X, X_ref)
+        assert torch.equal(y, y_ref)
+
+
+def test_device_loader_shuffle_covers_all_samples(data_dir):
+    train_dl, _ = create_dataloaders(
+        root_dir=data_dir, location=LOCATIONS, input_len=7, output_len=3, batch_size=4
+    )
+    shuffled_dl, _ = create_dataloaders(
+        root_dir=data_dir,
+        location=LOCATIONS,
+        input_len=7,
+        output_len=3,
+        batch_size=4,
+        shuffle=True,
+        device="cpu",
+    )
+    targets = torch.cat([y for _, y in train_dl])
+    shuffled_targets = torch.cat([y for _, y in shuffled_dl])
+    assert shuffled_targets.shape == targets.shape
+    assert torch.allclose(shuffled_targets.sum(dim=0), targets.sum(dim=0), atol=1e-4)
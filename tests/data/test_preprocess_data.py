@@ -0,0 +1,111 @@
+import pytest
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from meteo_model.data.data_cache import get_cache_path
+from meteo_model.data.preprocess_data import clean_data_for_, prepocessing
+
+CITIES = ["WARSAW", "KRAKOW", "POZNAN"]
+RAW_COLUMNS = ["tavg", "tmin", "tmax", "prcp", "snow", "wdir", "wspd", "wpgt", "pres", "tsun"]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    for year in range(2012, 2025):
+        year_dir = tmp_path / "data" / "raw" / "weather_data" / str(year)
+        year_dir.mkdir(parents=True)
+        n_days = 366 if year % 4 == 0 else 365
+        for city in CITIES:
+            values = rng.normal(loc=10.0, scale=3.0, size=(n_days, len(RAW_COLUMNS))).clip(0)
+            values[rng.random(size=values.shape) < 0.05] = np.nan
+            df = pd.DataFrame(values, columns=RAW_COLUMNS)
+            df.insert(0, "station", city)
+            df.to_csv(year_dir / f"{city}_weather_data.csv", index=False)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def read_outputs(root: Path) -> dict[str, pd.DataFrame]:
+    return {
+        path.relative_to(root).as_posix(): pd.read_csv(path)
+        for stage in ("data/processed", "data/normalized")
+        for path in sorted((root / stage).rglob("*_weather_data.csv"))
+    }
+
+
+def test_parallel_preprocessing_matches_sequential(workdir):
+    prepocessing(CITIES)
+    sequential = read_outputs(workdir)
+    assert len(sequential) == 2 * 13 * len(CITIES)
+
+    for path in (workdir / "data").rglob("*"):
+        if path.is_file() and "raw" not in path.parts:
+            path.unlink()
+
+    prepocessing(CITIES, num_workers=2)
+    parallel = read_outputs(workdir)
+    assert parallel.keys() == sequential.keys()
+    for key, df in sequential.items():
+        pd.testing.assert_frame_equal(parallel[key], df)
+
+
+def test_parallel_cleaning_reports_messages_in_order(workdir, capsys):
+    clean_data_for_(CITIES, num_workers=2)
+    lines = [line for line in capsys.readouterr().out.splitlines() if not line.startswith("-")]
+    assert [line.split(":")[0] for line in lines] == [city for city in CITIES for _ in range(6)]
+    assert lines[0] == "WARSAW: 13 files found."
+
+
+def get_output_mtimes(root: Path) -> dict[str, int]:
+    return {
+        path.relative_to(root).as_posix(): path.stat().st_mtime_ns
+        for stage in ("data/processed", "data/normalized")
+        for path in sorted((root / stage).rglob("*_weather_data.csv"))
+    }
+
+
+def test_incremental_preprocessing_skips_unchanged_inputs(workdir):
+    prepocessing(CITIES, incremental=True)
+    mtimes = get_output_mtimes(workdir)
+
+    cache_paths = [
+        get_cache_path(workdir / stage) for stage in ("data/processed/weather_data", "data/normalized")
+    ]
+    cache_mtimes = [path.stat().st_mtime_ns for path in cache_paths]
+
+    raw_file = workdir / "data/raw/weather_data/2015/KRAKOW_weather_data.csv"
+    raw_file.write_text(raw_file.read_text())
+    prepocessing(CITIES, incremental=True)
+    assert get_output_mtimes(workdir) == mtimes
+    assert [path.stat().st_mtime_ns for path in cache_paths] == cache_mtimes
+
+
+def test_incremental_preprocessing_reprocesses_changed_year(workdir):
+    prepocessing(CITIES, incremental=True)
+    mtimes = get_output_mtimes(workdir)
+
+    raw_file = workdir / "data/raw/weather_data/2015/KRAKOW_weather_data.csv"
+    df = pd.read_csv(raw_file)
+    df["tavg"] = df["tavg"] + 1.0
+    df.to_csv(raw_file, index=False)
+    prepocessing(CITIES, incremental=True)
+    incremental = read_outputs(workdir)
+
+    # The median of KRAKOW changed, so all of its years are cleaned again.
+    changed = {key for key, mtime in get_output_mtimes(workdir).items() if mtime != mtimes[key]}
+    assert {key for key in changed if key.startswith("data/processed")} == {
+        f"data/processed/weather_data/{year}/KRAKOW_weather_data.csv"
+        for year in range(2012, 2025)
+    }
+    assert "data/normalized/2015/KRAKOW_weather_data.csv" in changed
+    assert all("KRAKOW" in key for key in changed)
+
+    for stage in ("data/processed", "data/normalized", "data/median"):
+        for path in (workdir / stage).rglob("*.csv"):
+            path.unlink()
+    prepocessing(CITIES)
+    full = read_outputs(workdir)
+    assert full.keys() == incremental.keys()
+    for key, df in full.items():
+        pd.testing.assert_frame_equal(incremental[key], df)
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from meteo_model.data.api import fetch_data
+from meteo_model.data.api.weather_cache import (
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    WeatherDataCache,
+)
+
+STATIONS = ["WARSAW", "KRAKOW"]
+STATS = {
+    attr: {"mean": 10.0, "std": 5.0} for attr in ["tavg", "tmin", "tmax", "wspd", "pres", "snow"]
+}
+
+
+class FakeMeteostatHandler(BaseHTTPRequestHandler):
+    requests: list[dict[str, str]] = []
+
+    def do_GET(self):
+        params = {key: value[0] for key, value in parse_qs(urlparse(self.path).query).items()}
+        FakeMeteostatHandler.requests.append(params)
+        start = datetime.strptime(params["start"], "%Y-%m-%d")
+        end = datetime.strptime(params["end"], "%Y-%m-%d")
+        data = [
+            {
+                "date": (start + timedelta(days=i)).strftime("%Y-%m-%d %H:%M:%S"),
+                "tavg": 10.0 + i,
+                "tmin": 5.0 + i,
+                "tmax": 15.0 + i,
+                "prcp": 1.0,
+                "snow": 0.0,
+                "wdir": 90.0,
+                "wspd": 12.0,
+                "wpgt": None,
+                "pres": 1013.0,
+                "tsun": None,
+            }
+            for i in range((end - start).days + 1)
+        ]
+        body = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    (tmp_path / "data" / "median").mkdir(parents=True)
+    (tmp_path / "data" / "stats.json").write_text(json.dumps(STATS))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(fetch_data, "MIN_REQUEST_INTERVAL", 0.0)
+
+    FakeMeteostatHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMeteostatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(fetch_data, "API_URL", f"http://127.0.0.1:{server.server_port}/")
+    yield FakeMeteostatHandler.requests
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("backend_type", ["memory", "disk"])
+def test_cached_data_matches_uncached(upstream, tmp_path, backend_type):
+    backend = (
+        MemoryCacheBackend() if backend_type == "memory" else DiskCacheBackend(tmp_path / "c")
+    )
+    cache = WeatherDataCache(backend)
+
+    expected, expected_date = fetch_data.get_normalised_data_from_api(7, STATIONS)
+    assert len(upstream) == len(STATIONS)
+
+    first, first_date = fetch_data.get_normalised_data_from_api(7, STATIONS, cache)
+    second, second_date = fetch_data.get_normalised_data_from_api(7, STATIONS, cache)
+    assert len(upstream) == 2 * len(STATIONS)
+
+    assert first_date == second_date == expected_date
+    for station in STATIONS:
+        pd.testing.assert_frame_equal(first[station], expected[station])
+        pd.testing.assert_frame_equal(second[station], expected[station])
+
+
+def test_disk_cache_is_shared_between_instances(upstream, tmp_path):
+    fetch_data.get_normalised_data_from_api(
+        7, STATIONS, WeatherDataCache(DiskCacheBackend(tmp_path))
+    )
+    fetch_data.get_normalised_data_from_api(
+        7, STATIONS, WeatherDataCache(DiskCacheBackend(tmp_path))
+    )
+    assert len(upstream) == len(STATIONS)
+
+
+def test_cache_entries_expire_after_ttl(upstream, fake_clock):
+    cache = WeatherDataCache(ttl=60.0, clock=fake_clock)
+
+    fetch_data.get_normalised_data_from_api(7, STATIONS, cache)
+    fake_clock.now += 30.0
+    fetch_data.get_normalised_data_from_api(7, STATIONS, cache)
+    assert len(upstream) == len(STATIONS)
+
+    fake_clock.now += 31.0
+    fetch_data.get_normalised_data_from_api(7, STATIONS, cache)
+    assert len(upstream) == 2 * len(STATIONS)
+
+
+def test_cache_evicts_previous_days_on_date_rollover(upstream, fake_clock):
+    cache = WeatherDataCache(ttl=float("inf"), clock=fake_clock)
+
+    def fetch():
+        return pd.DataFrame({"date": ["x"]}), pd.DataFrame({"tavg": [0.0]})
+
+    today = datetime.fromtimestamp(fake_clock.now).strftime("%Y-%m-%d")
+    cache.get_or_fetch("WARSAW", "2024-01-01", today, fetch)
+    cache.get_or_fetch("KRAKOW", "2024-01-01", "2024-01-08", fetch)
+    assert cache.backend.keys() == [("WARSAW", "2024-01-01", today)]
+
+    fake_clock.now += 24 * 3600
+    tomorrow = datetime.fromtimestamp(fake_clock.now).strftime("%Y-%m-%d")
+    cache.get_or_fetch("KRAKOW", "2024-01-01", tomorrow, fetch)
+    assert cache.backend.keys() == [("KRAKOW", "2024-01-01", tomorrow)]
+
+
+def test_concurrent_misses_fetch_once(fake_clock):
+    cache = WeatherDataCache(ttl=60.0, clock=fake_clock)
+    today = datetime.fromtimestamp(fake_clock.now).strftime("%Y-%m-%d")
+    fetches = []
+
+    def fetch():
+        fetches.append(None)
+        time.sleep(0.05)
+        return pd.DataFrame({"date": ["x"]}), pd.DataFrame({"tavg": [0.0]})
+
+    def get(_):
+        return cache.get_or_fetch("WARSAW", "2024-01-01", today, fetch)
+
+    for expected_fetches in (1, 2):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(get, range(8)))
+        assert len(fetches) == expected_fetches
+        fake_clock.now += 61.0
@@ -0,0 +1,84 @@
+import pytest
+import torch
+from meteo_model.model.weather_model_lstm import GroupedWeatherModelLSTM, WeatherModelLSTM
+
+NUM_FEATURES = 9
+
+
+@pytest.mark.parametrize("fused", [True, False])
+@pytest.mark.parametrize("num_locations,num_layers", [(1, 1), (3, 2), (5, 1)])
+def test_grouped_lstm_matches_per_location_lstm(num_locations, num_layers, fused):
+    torch.manual_seed(0)
+    model = WeatherModelLSTM(NUM_FEATURES, num_locations, 3, 16, num_layers).eval()
+    grouped = GroupedWeatherModelLSTM(NUM_FEATURES, num_locations, 3, 16, num_layers).eval()
+    grouped.load_state_dict(model.state_dict())
+    grouped.fused = fused
+
+    x = torch.randn(4, num_locations, 10, NUM_FEATURES)
+    with torch.no_grad():
+        torch.testing.assert_close(
+            grouped.process_locations_with_state(x, weights=grouped.stack_weights())[0],
+            model.process_locations(x),
+        )
+        torch.testing.assert_close(grouped(x), model(x))
+        torch.testing.assert_close(grouped(x[0]), model(x[0]))
+
+
+def test_grouped_lstm_gradients_match():
+    torch.manual_seed(0)
+    model = WeatherModelLSTM(NUM_FEATURES, 3, 2, 8, 2)
+    grouped = GroupedWeatherModelLSTM(NUM_FEATURES, 3, 2, 8, 2)
+    grouped.load_state_dict(model.state_dict())
+    grouped.fused = True
+
+    x = torch.randn(2, 3, 6, NUM_FEATURES)
+    model(x).square().sum().backward()
+    grouped(x).square().sum().backward()
+    for (name, param), grouped_param in zip(model.named_parameters(), grouped.parameters()):
+        torch.testing.assert_close(grouped_param.grad, param.grad, msg=name)
+
+
+def test_grouped_lstm_is_fused_on_cuda_only():
+    grouped = GroupedWeatherModelLSTM(NUM_FEATURES, 2, 2, 8, 1)
+    assert grouped.stack_weights() is None
+    grouped.fused = True
+    assert grouped.stack_weights() is not None
+
+
+def test_lstm_loads_grouped_checkpoint():
+    grouped = GroupedWeatherModelLSTM(NUM_FEATURES, 2, 2, 8, 1)
+    model = WeatherModelLSTM(NUM_FEATURES, 2, 2, 8, 1)
+    model.load_state_dict(grouped.state_dict())
+
+
+@pytest.mark.parametrize("fused", [True, False])
+@pytest.mark.parametrize("model_class", [WeatherModelLSTM, GroupedWeatherModelLSTM])
+def test_stateful_decoding_matches_growing_window(model_class, fused):
+    torch.manual_seed(0)
+    model = model_class(NUM_FEATURES, 3, 4, 16, 2).eval()
+    model.fused = fused
+    x = torch.randn(2, 3, 8, NUM_FEATURES)
+
+    with torch.no_grad():
+        window = x
+        expected = []
+        for _ in range(model.output_len):
+            yhat = model.process_locations(window)[:, :, -1:, :]
+            expected.append(yhat)
+            window = torch.cat([window, yhat], dim=2)
+        torch.testing.assert_close(
+            model.decode_stateful(x, model.stack_weights()), torch.cat(expected, dim=2)
+        )
+
+        model.stateful_decoding = True
+        assert model(x).shape == (2, 1, 4, NUM_FEATURES)
+
+
+def test_stateful_decoding_of_single_step_matches_sliding_window():
+    torch.manual_seed(0)
+    model = WeatherModelLSTM(NUM_FEATURES, 2, 1, 16, 1).eval()
+    x = torch.randn(2, 2, 8, NUM_FEATURES)
+    with torch.no_grad():
+        expected = model(x)
+        model.stateful_decoding = True
+        torch.testing.assert_close(model(x), expected)
@@ -0,0 +1,66 @@
+import pytest
+import torch
+from meteo_model.model.weather_model_tcn import GroupedWeatherModelTCN, WeatherModelTCN
+
+NUM_FEATURES = 9
+
+
+def create_model(num_locations: int, output_len: int, num_channels: list[int], kernel_size: int):
+    torch.manual_seed(0)
+    return WeatherModelTCN(NUM_FEATURES, num_locations, output_len, num_channels, kernel_size, 0.1)
+
+
+@pytest.mark.parametrize("num_channels,kernel_size", [([9, 2, 1, 2, 9], 2), ([16, 9], 3)])
+def test_streaming_decoding_matches_sliding_window(num_channels, kernel_size):
+    model = create_model(3, 8, num_channels, kernel_size).eval()
+    x = torch.randn(4, 3, model.receptive_field, NUM_FEATURES)
+
+    with torch.no_grad():
+        expected = model(x)
+        model.streaming_decoding = True
+        torch.testing.assert_close(model(x), expected)
+        torch.testing.assert_close(model(x[0]), expected[:1])
+
+
+def test_grouped_streaming_decoding_matches_sliding_window():
+    model = create_model(3, 8, [16, 9], 3).eval()
+    grouped = GroupedWeatherModelTCN.from_per_location(model).eval()
+    x = torch.randn(4, 3, grouped.receptive_field, NUM_FEATURES)
+
+    with torch.no_grad():
+        expected = grouped(x)
+        grouped.streaming_decoding = True
+        torch.testing.assert_close(grouped(x), expected)
+        model.streaming_decoding = True
+        torch.testing.assert_close(grouped(x), model(x))
+
+
+def test_supports_streaming_decoding():
+    model = create_model(1, 1, [9, 2, 1, 2, 9], 2)
+    assert not model.supports_streaming_decoding(32)
+    assert model.supports_streaming_decoding(model.receptive_field)
+
+
+def test_receptive_field():
+    model = create_model(1, 1, [9, 2, 1, 2, 9], 2)
+    assert model.receptive_field == 63
+
+    x = torch.randn(1, 1, 80, NUM_FEATURES)
+    y = x.clone()
+    y[:, :, : 80 - model.receptive_field] = 0.0
+    with torch.no_grad():
+        model.eval()
+        last = model.process_locations(x)[:, :, -1]
+        torch.testing.assert_close(model.process_locations(y)[:, :, -1], last)
+
+
+@pytest.mark.parametrize("num_channels,kernel_size", [([9, 2, 1, 2, 9], 2), ([16, 9], 3)])
+def test_grouped_tcn_matches_per_location_tcn(num_channels, kernel_size):
+    model = create_model(4, 3, num_channels, kernel_size).eval()
+    grouped = GroupedWeatherModelTCN.from_per_location(model).eval()
+
+    x = torch.randn(2, 4, 12, NUM_FEATURES)
+    with torch.no_grad():
+        torch.testing.assert_close(grouped.process_locations(x), model.process_locations(x))
+        torch.testing.assert_close(grouped(x), model(x))
+        torch.testing.assert_close(grouped(x[0]), model(x[0]))
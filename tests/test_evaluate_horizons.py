@@ -0,0 +1,27 @@
+from meteo_model.evaluate_horizons import get_common_start_days, get_test_start_days
+
+
+class FakeDataset:
+    def __init__(self, total_days: int, input_len: int, output_len: int):
+        self.input_len = input_len
+        self.output_len = output_len
+        self.total_days = total_days
+
+    def __len__(self) -> int:
+        return self.total_days - self.input_len - self.output_len
+
+
+def test_get_test_start_days():
+    dataset = FakeDataset(120, input_len=10, output_len=10)
+    assert get_test_start_days(dataset) == range(90, 110)
+
+
+def test_common_start_days_are_valid_test_samples_of_every_dataset():
+    datasets = [FakeDataset(1000, 7, 8), FakeDataset(1000, 28, 5), FakeDataset(1000, 6, 1)]
+    start_days = get_common_start_days(datasets)
+
+    assert len(start_days) > 0
+    for dataset in datasets:
+        test_days = get_test_start_days(dataset)
+        assert start_days.start >= test_days.start and start_days.stop <= test_days.stop
+        assert start_days.stop - 1 + dataset.output_len <= dataset.total_days
@@ -0,0 +1,40 @@
+import pytest
+from meteo_model.serving_config import MAX_DAYS, MODELS_FOR_DAYS, check_multi_horizon_output_len
+from meteo_model.serving_config import get_input_len, get_model_for_days, get_serving_models
+
+
+def test_get_model_for_days_uses_specialized_models(monkeypatch):
+    monkeypatch.delenv("MULTI_HORIZON_MODEL", raising=False)
+    assert get_model_for_days(5) == MODELS_FOR_DAYS[5]
+
+
+def test_get_model_for_days_uses_multi_horizon_model(monkeypatch):
+    monkeypatch.setenv("MULTI_HORIZON_MODEL", "MeteoModel-multi:3:14")
+    assert get_model_for_days(1) == ("MeteoModel-multi", 3, 14)
+    assert get_model_for_days(8) == ("MeteoModel-multi", 3, 14)
+
+
+def test_get_serving_models(monkeypatch):
+    monkeypatch.delenv("MULTI_HORIZON_MODEL", raising=False)
+    assert len(get_serving_models()) == len(MODELS_FOR_DAYS)
+
+    monkeypatch.setenv("MULTI_HORIZON_MODEL", "MeteoModel-multi:latest:14")
+    assert get_serving_models() == [("MeteoModel-multi", None)]
+
+
+def test_get_input_len(monkeypatch):
+    monkeypatch.delenv("MULTI_HORIZON_MODEL", raising=False)
+    assert get_input_len("MeteoModel-5_days") == MODELS_FOR_DAYS[5][2]
+    with pytest.raises(KeyError):
+        get_input_len("MeteoModel-9_days")
+
+    monkeypatch.setenv("MULTI_HORIZON_MODEL", "MeteoModel-multi:latest:14")
+    assert get_input_len("MeteoModel-multi") == 14
+
+
+def test_check_multi_horizon_output_len(monkeypatch):
+    monkeypatch.setenv("MULTI_HORIZON_MODEL", "MeteoModel-multi:latest:14")
+    check_multi_horizon_output_len("MeteoModel-multi", MAX_DAYS)
+    check_multi_horizon_output_len("MeteoModel-1_day", 1)
+    with pytest.raises(ValueError, match="at least 8"):
+        check_multi_horizon_output_len("MeteoModel-multi", MAX_DAYS - 1)
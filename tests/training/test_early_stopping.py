@@ -0,0 +1,30 @@
+import torch
+
+from meteo_model.training.early_stopping import EarlyStopping
+
+
+def test_early_stopping_stops_after_patience():
+    model = torch.nn.Linear(2, 2)
+    early_stopping = EarlyStopping(patience=2, min_delta=0.1)
+
+    stops = [
+        early_stopping.step(loss, model, epoch)
+        for epoch, loss in enumerate([1.0, 0.5, 0.45, 0.42, 0.3])
+    ]
+    assert stops == [False, False, False, True, False]
+    assert early_stopping.best_epoch == 4
+    assert early_stopping.best_loss == 0.3
+
+
+def test_early_stopping_restores_best_weights():
+    model = torch.nn.Linear(2, 2)
+    early_stopping = EarlyStopping(patience=1)
+    early_stopping.step(1.0, model, 0)
+    best_weight = model.weight.detach().clone()
+
+    with torch.no_grad():
+        model.weight.add_(1.0)
+    assert early_stopping.step(2.0, model, 1)
+
+    early_stopping.restore_best(model)
+    assert torch.equal(model.weight, best_weight)
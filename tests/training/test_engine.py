@@ -0,0 +1,101 @@
+import math
+
+import pytest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from meteo_model.training.engine import get_amp_dtype, train
+from meteo_model.training.engine import test_step as run_test_step
+from meteo_model.training.engine import train_step as run_train_step
+
+
+@pytest.fixture
+def dataloader():
+    generator = torch.Generator().manual_seed(0)
+    inputs = torch.randn(10, 2, 3, 4, generator=generator)
+    targets = torch.randn(10, 2, 3, 4, generator=generator)
+    return DataLoader(TensorDataset(inputs, targets), batch_size=4)
+
+
+def reference_metrics(model, dataloader, loss_fn):
+    total_loss, total_mae, total_samples = 0.0, 0.0, 0
+    with torch.no_grad():
+        for inputs, targets in dataloader:
+            outputs = model(inputs)
+            total_loss += loss_fn(outputs, targets).item()
+            total_mae += torch.abs(outputs - targets).sum().item()
+            total_samples += targets.size(0) * targets.size(2)
+    mse = total_loss / total_samples
+    return mse, total_mae / total_samples, math.sqrt(mse)
+
+
+def test_test_step_matches_per_batch_metrics(dataloader):
+    torch.manual_seed(0)
+    model = torch.nn.Linear(4, 4)
+    loss_fn = torch.nn.MSELoss(reduction="sum")
+
+    metrics = run_test_step(model, dataloader, loss_fn, device="cpu")
+    assert metrics == pytest.approx(reference_metrics(model, dataloader, loss_fn))
+
+
+def test_train_step_matches_per_batch_metrics(dataloader):
+    torch.manual_seed(0)
+    model = torch.nn.Linear(4, 4)
+    loss_fn = torch.nn.MSELoss(reduction="sum")
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.0)
+
+    metrics = run_train_step(model, dataloader, optimizer, loss_fn, device="cpu")
+    assert all(isinstance(value, float) for value in metrics)
+    assert metrics == pytest.approx(reference_metrics(model, dataloader, loss_fn))
+
+
+def test_train_step_with_amp(dataloader):
+    torch.manual_seed(0)
+    model = torch.nn.Linear(4, 4)
+    loss_fn = torch.nn.MSELoss(reduction="sum")
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.0)
+    amp_dtype = get_amp_dtype("cpu")
+    assert amp_dtype == torch.bfloat16
+
+    reference = reference_metrics(model, dataloader, loss_fn)
+    metrics = run_train_step(
+        model, dataloader, optimizer, loss_fn, device="cpu", amp_dtype=amp_dtype
+    )
+    assert model.weight.dtype == model.weight.grad.dtype == torch.float32
+    assert metrics == pytest.approx(reference, rel=0.05)
+
+
+def test_train_stops_early(dataloader):
+    torch.manual_seed(0)
+    model = torch.nn.Linear(4, 4)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.0)
+
+    results = train(
+        model=model,
+        train_dataloader=dataloader,
+        test_dataloader=dataloader,
+        optimizer=optimizer,
+        loss_fn=torch.nn.MSELoss(),
+        epochs=10,
+        device="cpu",
+        enable_logging=False,
+        early_stopping_patience=2,
+    )
+    assert all(len(values) == 3 for values in results.values())
+
+
+def test_train_calls_epoch_callback(dataloader):
+    epochs = []
+    results = train(
+        model=torch.nn.Linear(4, 4),
+        train_dataloader=dataloader,
+        test_dataloader=dataloader,
+        optimizer=torch.optim.SGD(torch.nn.Linear(4, 4).parameters(), lr=0.0),
+        loss_fn=torch.nn.MSELoss(),
+        epochs=2,
+        device="cpu",
+        enable_logging=False,
+        epoch_callback=lambda epoch, metrics: epochs.append((epoch, metrics)),
+    )
+    assert [epoch for epoch, _ in epochs] == [0, 1]
+    assert epochs[1][1] == {key: values[1] for key, values in results.items()}
@@ -0,0 +1,55 @@
+import optuna
+import pytest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+from meteo_model.training.engine import train
+from meteo_model.training.pruning import PRUNERS, create_pruner, get_pruning_callback
+
+
+@pytest.mark.parametrize("name", list(PRUNERS))
+def test_create_pruner(name):
+    assert isinstance(create_pruner(name), optuna.pruners.BasePruner)
+
+
+def test_create_pruner_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        create_pruner("random")
+
+
+def test_bad_trials_are_pruned_during_training():
+    generator = torch.Generator().manual_seed(0)
+    x = torch.randn(8, 1, 3, 4, generator=generator)
+    dataloader = DataLoader(TensorDataset(x, x), batch_size=4)
+
+    def objective(trial):
+        model = torch.nn.Linear(4, 4)
+        with torch.no_grad():
+            model.weight.copy_(torch.eye(4) * trial.suggest_float("scale", 0.0, 10.0))
+            model.bias.zero_()
+        results = train(
+            model=model,
+            train_dataloader=dataloader,
+            test_dataloader=dataloader,
+            optimizer=torch.optim.SGD(model.parameters(), lr=0.0),
+            loss_fn=torch.nn.MSELoss(),
+            epochs=4,
+            device="cpu",
+            enable_logging=False,
+            epoch_callback=get_pruning_callback(trial),
+        )
+        return results["Test_MSE"][-1]
+
+    study = optuna.create_study(
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=2),
+        sampler=optuna.samplers.TPESampler(seed=0),
+    )
+    study.enqueue_trial({"scale": 1.0})
+    study.enqueue_trial({"scale": 2.0})
+    study.enqueue_trial({"scale": 9.0})
+    study.optimize(objective, n_trials=3)
+
+    states = [trial.state for trial in study.trials]
+    assert states[:2] == [optuna.trial.TrialState.COMPLETE] * 2
+    assert states[2] == optuna.trial.TrialState.PRUNED
+    assert list(study.trials[2].intermediate_values) == [0]
@@ -0,0 +1,43 @@
+import pytest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from meteo_model.utils.evaluation_utils import compare_models, compute_errors
+from meteo_model.utils.evaluation_utils import compute_horizon_errors
+
+
+class ScaledModel(torch.nn.Module):
+    def __init__(self, scale: float):
+        super().__init__()
+        self.scale = scale
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.scale * x
+
+
+def test_compute_errors():
+    errors = compute_errors(torch.tensor([1.0, 2.0, 4.0]), torch.tensor([1.0, 1.0, 2.0]))
+    assert errors == pytest.approx({"MSE": 5 / 3, "MAE": 1.0, "RMSE": (5 / 3) ** 0.5})
+
+
+def test_compare_models():
+    x = torch.arange(8, dtype=torch.float32).view(4, 2)
+    dataloader = DataLoader(TensorDataset(x, x), batch_size=2)
+    results = compare_models(
+        {"exact": ScaledModel(1.0), "scaled": ScaledModel(2.0)}, dataloader, torch.device("cpu")
+    )
+
+    assert list(results.index) == ["exact", "scaled"]
+    assert results.loc["exact", "MSE"] == 0.0
+    assert results.loc["scaled", "MAE"] == x.mean().item()
+    assert results.loc["scaled", "Max diff"] == 7.0
+    assert (results["Latency [ms/batch]"] > 0).all()
+
+
+def test_compute_horizon_errors():
+    targets = torch.zeros(2, 1, 3, 4)
+    predictions = torch.ones(2, 1, 3, 4).cumsum(dim=2)
+    errors = compute_horizon_errors(predictions, targets, 3)
+
+    assert list(errors.index) == [1, 2, 3]
+    assert errors["MAE"].tolist() == [1.0, 1.5, 2.0]
+    assert errors.loc[2, "MSE"] == 2.5
@@ -0,0 +1,32 @@
+import mlflow
+from mlflow.tracking import MlflowClient
+
+from meteo_model.utils.metrics_logger import AsyncMetricsLogger
+
+
+class FailingClient:
+    def log_batch(self, run_id, metrics):
+        raise RuntimeError("tracking store unavailable")
+
+
+def test_metrics_are_logged_per_epoch(tracking_uri):
+    with mlflow.start_run() as run:
+        with AsyncMetricsLogger(run.info.run_id) as metrics_logger:
+            for epoch in range(3):
+                metrics_logger.log(epoch, {"Train_MSE": 1.0 / (epoch + 1), "Test_MSE": 2.0})
+
+    client = MlflowClient()
+    history = client.get_metric_history(run.info.run_id, "Train_MSE")
+    assert [(metric.step, metric.value) for metric in history] == [(0, 1.0), (1, 0.5), (2, 1 / 3)]
+    assert len(client.get_metric_history(run.info.run_id, "Test_MSE")) == 3
+
+
+def test_logging_errors_are_counted_and_reported_on_close(caplog):
+    metrics_logger = AsyncMetricsLogger("run", client=FailingClient())
+    for epoch in range(3):
+        metrics_logger.log(epoch, {"Train_MSE": 1.0})
+    metrics_logger.close()
+
+    assert metrics_logger.failed_steps == [0, 1, 2]
+    assert "Metrics of 3 steps were not logged" in caplog.text
+    assert "tracking store unavailable" in caplog.text
@@ -0,0 +1,108 @@
+import mlflow
+import pytest
+import torch
+from meteo_model.model.weather_model_lstm import GroupedWeatherModelLSTM, WeatherModelLSTM
+from meteo_model.model.weather_model_tcn import GroupedWeatherModelTCN, WeatherModelTCN
+from meteo_model.utils.model_utils import (
+    export_torchscript,
+    get_latest_model_version,
+    get_output_len,
+    load_serving_model,
+    log_torchscript_model,
+    quantize_model,
+)
+
+MODELS = [
+    lambda: WeatherModelLSTM(9, 3, 4, 16, 2),
+    lambda: GroupedWeatherModelLSTM(9, 3, 4, 16, 2),
+    lambda: WeatherModelTCN(9, 3, 4, [9, 2, 9], 2, 0.1),
+    lambda: GroupedWeatherModelTCN(9, 3, 4, [9, 2, 9], 2, 0.1),
+]
+
+
+@pytest.mark.parametrize("create_model", MODELS)
+def test_torchscript_export_matches_eager_model(create_model):
+    torch.manual_seed(0)
+    model = create_model().eval()
+    scripted = export_torchscript(model, torch.randn(1, 3, 8, 9))
+
+    x = torch.randn(5, 3, 8, 9)
+    with torch.no_grad():
+        torch.testing.assert_close(scripted(x), model(x))
+
+
+def register_model(model: torch.nn.Module, name: str, export: bool) -> None:
+    with mlflow.start_run():
+        mlflow.pytorch.log_model(model, "models", registered_model_name=name)
+        if export:
+            log_torchscript_model(model, torch.randn(1, 3, 8, 9))
+
+
+def test_failed_torchscript_export_is_logged_as_warning(tracking_uri, caplog):
+    model = WeatherModelLSTM(9, 3, 2, 8, 1)
+    with mlflow.start_run():
+        assert not log_torchscript_model(model, torch.randn(1, 3, 8, 5))
+    assert "TorchScript export failed" in caplog.text
+
+
+def test_load_serving_model_prefers_torchscript(tracking_uri):
+    model = WeatherModelLSTM(9, 3, 2, 8, 1).eval()
+    register_model(model, "exported", export=True)
+    register_model(model, "not_exported", export=False)
+
+    exported = load_serving_model("exported", 1, map_location="cpu")
+    not_exported = load_serving_model("not_exported", 1, map_location="cpu")
+    assert isinstance(exported, torch.jit.ScriptModule)
+    assert isinstance(not_exported, WeatherModelLSTM)
+
+    x = torch.randn(2, 3, 8, 9)
+    with torch.no_grad():
+        torch.testing.assert_close(exported(x), model(x))
+        torch.testing.assert_close(not_exported(x), model(x))
+
+
+def test_load_serving_model_uses_eager_model_for_decoding_options(tracking_uri):
+    register_model(WeatherModelLSTM(9, 3, 2, 8, 1), "exported", export=True)
+
+    model = load_serving_model("exported", 1, map_location="cpu", stateful_decoding=True)
+    assert isinstance(model, WeatherModelLSTM)
+    model = load_serving_model("exported", 1, map_location="cpu", streaming_decoding=True)
+    assert isinstance(model, WeatherModelLSTM)
+
+
+@pytest.mark.parametrize("create_model", [MODELS[0], MODELS[2], MODELS[3]])
+def test_quantized_model_is_close_to_float_model(create_model):
+    torch.manual_seed(0)
+    model = create_model().eval()
+    quantized = quantize_model(model)
+
+    x = torch.randn(4, 3, 8, 9)
+    with torch.no_grad():
+        torch.testing.assert_close(quantized(x), model(x), atol=0.05, rtol=0.0)
+    assert model.final_fc.weight.dtype == torch.float32
+
+
+def test_quantized_lstm_uses_int8_layers():
+    quantized = quantize_model(MODELS[0]())
+    lstm, fc = quantized.submodels[0]
+    assert isinstance(lstm, torch.ao.nn.quantized.dynamic.LSTM)
+    assert isinstance(fc, torch.ao.nn.quantized.dynamic.Linear)
+
+
+def test_grouped_lstm_cannot_be_quantized():
+    with pytest.raises(ValueError):
+        quantize_model(MODELS[1]())
+
+
+def test_get_latest_model_version(tracking_uri):
+    model = WeatherModelLSTM(9, 3, 2, 8, 1)
+    register_model(model, "versioned", export=False)
+    register_model(model, "versioned", export=False)
+    assert get_latest_model_version("versioned") == 2
+
+
+@pytest.mark.parametrize("create_model", MODELS)
+def test_get_output_len_of_torchscript_export(create_model):
+    model = create_model().eval()
+    scripted = export_torchscript(model, torch.randn(1, 3, 8, 9))
+    assert get_output_len(scripted, num_locations=3, input_len=8) == model.output_len